@@ -0,0 +1,154 @@
+"""
+Uploaded profile pictures.
+
+Uploads are re-encoded without their metadata (EXIF, GPS, comments) and
+stored under MEDIA_ROOT by the SHA-256 of the result
+(avatars/ab/abcdef....jpg), so identical uploads share one file and a URL's
+content never changes, which lets the web server cache them forever.
+Fixed-size square WebP thumbnails are generated next to the original by a
+background task, which resizes in a process pool so the CPU work neither
+blocks requests nor the worker's other tasks. Only the thumbnails are
+published; the original is just their source.
+"""
+import hashlib
+import io
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+# Pillow decoders that uploads and stored originals may be opened with
+ALLOWED_FORMATS = ('JPEG', 'PNG', 'WEBP', 'GIF')
+ORIGINAL_QUALITY = 90
+THUMBNAIL_SIZES = (48, 128, 256)
+# The size embedded as `profile_picture` in event and comment payloads
+SUMMARY_SIZE = 48
+THUMBNAIL_QUALITY = 80
+
+_executor = None
+
+
+def original_name(digest, extension):
+    return f'avatars/{digest[:2]}/{digest}.{extension}'
+
+
+def thumbnail_name(name, size):
+    return f'{os.path.splitext(name)[0]}-{size}.webp'
+
+
+def sanitize(upload):
+    """
+    Re-encode an uploaded image in its own format, keeping only the pixels
+    (with the EXIF orientation applied) and the colour profile. Returns
+    (bytes, extension). Animated images keep their first frame.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(upload, formats=ALLOWED_FORMATS) as image:
+        image_format = image.format
+        icc_profile = image.info.get('icc_profile')
+        image = ImageOps.exif_transpose(image)
+        image.info = {}
+        options = {'quality': ORIGINAL_QUALITY} if image_format in ('JPEG', 'WEBP') else {}
+        if icc_profile:
+            options['icc_profile'] = icc_profile
+        output = io.BytesIO()
+        image.save(output, image_format, **options)
+    upload.seek(0)
+    return output.getvalue(), {'jpeg': 'jpg'}.get(image_format.lower(), image_format.lower())
+
+
+def store(upload):
+    """
+    Store an uploaded image (already validated by Pillow, e.g. through
+    DRF's ImageField) without its metadata, under its content hash.
+    Returns the storage name.
+    """
+    data, extension = sanitize(upload)
+    name = original_name(hashlib.sha256(data).hexdigest(), extension)
+    if not default_storage.exists(name):
+        name = default_storage.save(name, ContentFile(data))
+    return name
+
+
+def thumbnails_exist(name):
+    return all(default_storage.exists(thumbnail_name(name, size)) for size in THUMBNAIL_SIZES)
+
+
+def make_thumbnail(source, destination, size):
+    """Runs in a pool process: needs only Pillow and file paths."""
+    from PIL import Image, ImageOps
+
+    with Image.open(source, formats=ALLOWED_FORMATS) as image:
+        image = ImageOps.exif_transpose(image)
+        image = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+        thumbnail = ImageOps.fit(image, (size, size), Image.LANCZOS)
+        tmp = f'{destination}.tmp'
+        thumbnail.save(tmp, 'WEBP', quality=THUMBNAIL_QUALITY, method=4)
+    # Rename into place so readers never see a half-written thumbnail
+    os.replace(tmp, destination)
+    return destination
+
+
+def _pool():
+    global _executor
+    if _executor is None:
+        workers = getattr(settings, 'AVATAR_THUMBNAIL_WORKERS', None) or os.cpu_count() or 1
+        _executor = ProcessPoolExecutor(max_workers=workers)
+    return _executor
+
+
+def generate_thumbnails(name):
+    """Render every missing thumbnail size of the stored original `name`."""
+    source = default_storage.path(name)
+    futures = []
+    for size in THUMBNAIL_SIZES:
+        destination = default_storage.path(thumbnail_name(name, size))
+        if not os.path.exists(destination):
+            futures.append(_pool().submit(make_thumbnail, source, destination, size))
+    for future in futures:
+        future.result()
+
+
+def absolute(url, request):
+    """Absolute form of a media URL for clients on another origin (the SPA)."""
+    if not url or request is None:
+        return url
+    return request.build_absolute_uri(url)
+
+
+def urls(user, request=None):
+    """{size: url} of the user's picture thumbnails; empty until they are generated."""
+    if not (user.avatar and user.avatar_thumbnails):
+        return {}
+    return {
+        str(size): absolute(default_storage.url(thumbnail_name(user.avatar, size)), request)
+        for size in THUMBNAIL_SIZES
+    }
+
+
+def url(user, size=SUMMARY_SIZE, request=None):
+    """URL for displaying the picture at `size` px: the thumbnail, else an external profile_picture."""
+    return urls(user, request).get(str(size)) or user.profile_picture or None
+
+
+_json_media_urls = None
+
+
+def absolutize_json(body, request):
+    """
+    Make the picture URLs in rendered JSON (e.g. a stored event document)
+    absolute for `request`. Only "profile_picture" and size keys are
+    rewritten; quotes inside user text are escaped and never match.
+    """
+    global _json_media_urls
+    if not settings.MEDIA_URL.startswith('/'):
+        return body
+    if _json_media_urls is None:
+        keys = '|'.join(['profile_picture'] + [str(size) for size in THUMBNAIL_SIZES])
+        _json_media_urls = re.compile(f'("(?:{keys})":"){re.escape(settings.MEDIA_URL)}')
+    base = request.build_absolute_uri(settings.MEDIA_URL)
+    return _json_media_urls.sub(lambda match: match.group(1) + base, body)
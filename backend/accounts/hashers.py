@@ -0,0 +1,115 @@
+"""
+Password hashers with tunable costs that run in a bounded worker pool.
+
+Hashing is deliberately CPU-expensive. Running it through a fixed-size pool
+caps how many cores a login or registration storm can occupy, so the rest of
+the API keeps serving; callers that cannot get a slot in time receive a 503
+with Retry-After instead of piling up. The pool and its bound are per
+process: by default each of the WEB_CONCURRENCY server processes on a host
+gets an equal share of the CPUs, so together they stay within one hash per
+core.
+
+Which hasher is preferred, and its cost, is configured in settings
+(PASSWORD_HASH_POLICY and friends). Django rehashes a user's password on the
+next successful login whenever the preferred hasher or its cost changes.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class PasswordHashingBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many sign-in attempts in progress, please retry shortly.'
+    default_code = 'password_hashing_busy'
+
+    def __init__(self, detail=None, code=None, wait=1):
+        super().__init__(detail, code)
+        self.wait = wait
+
+
+_executor = None
+_slots = None
+_init_lock = threading.Lock()
+_local = threading.local()
+
+
+def default_workers():
+    """This process's share of the host's CPUs."""
+    processes = max(getattr(settings, 'WEB_CONCURRENCY', 1), 1)
+    return max((os.cpu_count() or 1) // processes, 1)
+
+
+def _pool():
+    global _executor, _slots
+    if _executor is None:
+        with _init_lock:
+            if _executor is None:
+                workers = getattr(settings, 'PASSWORD_HASH_WORKERS', None) or default_workers()
+                _slots = threading.BoundedSemaphore(workers)
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash',
+                                               initializer=_mark_pool_thread)
+    return _executor, _slots
+
+
+def _mark_pool_thread():
+    _local.in_pool = True
+
+
+@contextmanager
+def unbounded():
+    """Run hashers inline in the calling thread, bypassing the pool (benchmarks)."""
+    previous = getattr(_local, 'in_pool', False)
+    _local.in_pool = True
+    try:
+        yield
+    finally:
+        _local.in_pool = previous
+
+
+def run_bounded(func, *args):
+    """
+    Run `func(*args)` in the hashing pool, waiting at most
+    PASSWORD_HASH_QUEUE_TIMEOUT seconds for a free worker.
+    """
+    if getattr(_local, 'in_pool', False):
+        # Hashers call each other (e.g. PBKDF2 verify -> encode); don't re-enter the pool
+        return func(*args)
+
+    executor, slots = _pool()
+    timeout = getattr(settings, 'PASSWORD_HASH_QUEUE_TIMEOUT', 5)
+    if not slots.acquire(timeout=timeout):
+        raise PasswordHashingBusy()
+    try:
+        return executor.submit(func, *args).result()
+    finally:
+        slots.release()
+
+
+class BoundedHasherMixin:
+    def encode(self, *args, **kwargs):
+        return run_bounded(lambda: super(BoundedHasherMixin, self).encode(*args, **kwargs))
+
+    def verify(self, password, encoded):
+        return run_bounded(super().verify, password, encoded)
+
+
+class Argon2PasswordHasher(BoundedHasherMixin, hashers.Argon2PasswordHasher):
+    time_cost = getattr(settings, 'ARGON2_TIME_COST', hashers.Argon2PasswordHasher.time_cost)
+    memory_cost = getattr(settings, 'ARGON2_MEMORY_COST', hashers.Argon2PasswordHasher.memory_cost)
+    parallelism = getattr(settings, 'ARGON2_PARALLELISM', hashers.Argon2PasswordHasher.parallelism)
+
+
+class ScryptPasswordHasher(BoundedHasherMixin, hashers.ScryptPasswordHasher):
+    work_factor = getattr(settings, 'SCRYPT_WORK_FACTOR', hashers.ScryptPasswordHasher.work_factor)
+
+
+class PBKDF2PasswordHasher(BoundedHasherMixin, hashers.PBKDF2PasswordHasher):
+    iterations = getattr(settings, 'PBKDF2_ITERATIONS', hashers.PBKDF2PasswordHasher.iterations)
+
@@ -0,0 +1,61 @@
+import math
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+from accounts.hashers import unbounded
+
+
+class Command(BaseCommand):
+    help = 'Report password checks (logins) per second per core for each hashing policy'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--target-ms', type=float,
+                            help='Suggest cost settings that make one check take about this long')
+
+    def measure(self, hasher, iterations):
+        # Hash inline, bypassing the pool (PBKDF2's verify calls encode): this
+        # measures one core
+        with unbounded():
+            encoded = hasher.encode('correct horse battery staple', hasher.salt())
+            started = time.perf_counter()
+            for _ in range(iterations):
+                hasher.verify('correct horse battery staple', encoded)
+        return (time.perf_counter() - started) / iterations
+
+    def suggest(self, policy, hasher, seconds, target):
+        scale = target / seconds
+        if policy == 'argon2':
+            time_cost = hasher.time_cost * scale
+            if time_cost >= 1:
+                return f'ARGON2_TIME_COST={round(time_cost)}'
+            return f'ARGON2_TIME_COST=1 ARGON2_MEMORY_COST={max(19456, int(hasher.memory_cost * time_cost))}'
+        if policy == 'scrypt':
+            return f'SCRYPT_WORK_FACTOR={2 ** max(10, round(math.log2(hasher.work_factor * scale)))}'
+        return f'PBKDF2_ITERATIONS={max(10000, int(round(hasher.iterations * scale, -4)))}'
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'{"policy":<8} {"cost":<32} {"ms/login":>9} {"logins/s/core":>14}')
+        for policy, path in settings.PASSWORD_HASH_POLICIES.items():
+            hasher = import_string(path)()
+            try:
+                seconds = self.measure(hasher, options['iterations'])
+            except ValueError as e:
+                self.stdout.write(f'{policy:<8} unavailable: {e}')
+                continue
+
+            if policy == 'argon2':
+                cost = f't={hasher.time_cost} m={hasher.memory_cost}KiB p={hasher.parallelism}'
+            elif policy == 'scrypt':
+                cost = f'n={hasher.work_factor} r={hasher.block_size} p={hasher.parallelism}'
+            else:
+                cost = f'iterations={hasher.iterations}'
+            marker = ' *' if policy == settings.PASSWORD_HASH_POLICY else ''
+            self.stdout.write(f'{policy:<8} {cost:<32} {seconds * 1000:>9.1f} {1 / seconds:>14.1f}{marker}')
+
+            if options['target_ms']:
+                self.stdout.write(f'         -> {self.suggest(policy, hasher, seconds, options["target_ms"] / 1000)}')
+
+        self.stdout.write('* = current PASSWORD_HASH_POLICY')
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+
+class Command(BaseCommand):
+    help = 'Delete expired outstanding (and blacklisted) refresh tokens in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--sleep', type=float, default=0,
+                            help='Seconds to pause between batches to limit load')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        deleted = 0
+        while True:
+            ids = list(
+                OutstandingToken.objects.filter(expires_at__lte=now)
+                .order_by()
+                .values_list('id', flat=True)[:options['batch_size']]
+            )
+            if not ids:
+                break
+            # Blacklist entries cascade with their outstanding token
+            OutstandingToken.objects.filter(id__in=ids).delete()
+            deleted += len(ids)
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired tokens'))
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='avatar',
+            field=models.CharField(blank=True, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='avatar_thumbnails',
+            field=models.BooleanField(default=False),
+        ),
+    ]
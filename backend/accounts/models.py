@@ -6,7 +6,11 @@ class User(AbstractUser):
     email = models.EmailField(unique=True)
     first_name = models.CharField(max_length=30)
     last_name = models.CharField(max_length=30)
+    # External picture URL (e.g. from Google); an uploaded picture in `avatar` takes precedence
     profile_picture = models.URLField(blank=True, null=True)
+    # Storage name of the uploaded original, content-addressed; see accounts/avatars.py
+    avatar = models.CharField(max_length=200, blank=True)
+    avatar_thumbnails = models.BooleanField(default=False)
     bio = models.TextField(blank=True, max_length=500)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -0,0 +1,61 @@
+"""
+Fast refresh-token revocation checks.
+
+The simplejwt blacklist tables stay the source of truth. On top of them every
+process keeps a set of revoked jtis it has seen, and the shared cache holds a
+per-jti verdict, so a refresh normally costs a dict or cache lookup instead of
+a join across the blacklist tables.
+"""
+import threading
+import time
+
+from django.core.cache import cache
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+# How long a "not revoked" verdict may be served from the cache. Revoking
+# overwrites it immediately; this only bounds staleness if the cache write of a
+# revocation is lost.
+NEGATIVE_TIMEOUT = 60
+MAX_LOCAL_ENTRIES = 100000
+
+_revoked = {}
+_lock = threading.Lock()
+
+
+def _cache_key(jti):
+    return f'jwt:revoked:{jti}'
+
+
+def _remember(jti, exp):
+    with _lock:
+        if len(_revoked) >= MAX_LOCAL_ENTRIES:
+            now = time.time()
+            for expired in [key for key, value in _revoked.items() if value <= now]:
+                del _revoked[expired]
+            if len(_revoked) >= MAX_LOCAL_ENTRIES:
+                _revoked.clear()
+        _revoked[jti] = exp
+
+
+def mark_revoked(jti, exp):
+    """Record a revocation that has been written to the blacklist table."""
+    _remember(jti, exp)
+    cache.set(_cache_key(jti), True, max(int(exp - time.time()), 1))
+
+
+def is_revoked(jti, exp):
+    if jti in _revoked:
+        return True
+
+    revoked = cache.get(_cache_key(jti))
+    if revoked is None:
+        revoked = BlacklistedToken.objects.filter(token__jti=jti).exists()
+        if revoked:
+            cache.set(_cache_key(jti), True, max(int(exp - time.time()), 1))
+        else:
+            # add() never overwrites a revocation that landed in the meantime
+            cache.add(_cache_key(jti), False, NEGATIVE_TIMEOUT)
+
+    if revoked:
+        _remember(jti, exp)
+    return revoked
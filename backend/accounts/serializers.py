@@ -1,7 +1,12 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
+from django.db import transaction
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer as BaseTokenRefreshSerializer
+from . import avatars, summaries
 from .models import User
+from .tokens import RefreshToken
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -45,13 +50,87 @@ class UserLoginSerializer(serializers.Serializer):
 
 class UserSerializer(serializers.ModelSerializer):
     full_name = serializers.ReadOnlyField()
+    # Upload through a multipart PATCH of the profile
+    picture = serializers.ImageField(write_only=True, required=False)
+    profile_picture_urls = serializers.SerializerMethodField()
 
     class Meta:
         model = User
         fields = ('id', 'email', 'username', 'first_name', 'last_name', 'full_name', 
-                 'profile_picture', 'bio', 'created_at', 'updated_at')
+                 'profile_picture', 'profile_picture_urls', 'picture', 'bio', 'created_at', 'updated_at')
         read_only_fields = ('id', 'created_at', 'updated_at')
 
+    def get_profile_picture_urls(self, obj):
+        return avatars.urls(obj, self.context.get('request'))
+
+    def validate_picture(self, value):
+        max_size = settings.AVATAR_MAX_UPLOAD_SIZE
+        if value.size > max_size:
+            raise serializers.ValidationError(f'Picture must be smaller than {max_size // (1024 * 1024)} MB')
+        if value.image.format not in avatars.ALLOWED_FORMATS:
+            raise serializers.ValidationError(f"Picture must be one of {', '.join(avatars.ALLOWED_FORMATS)}")
+        return value
+
+    def update(self, instance, validated_data):
+        from .tasks import generate_avatar_thumbnails
+
+        picture = validated_data.pop('picture', None)
+        if picture is not None:
+            name = avatars.store(picture)
+            validated_data['avatar'] = name
+            validated_data['avatar_thumbnails'] = avatars.thumbnails_exist(name)
+        elif validated_data.get('profile_picture'):
+            # Switching to an external picture drops the uploaded one
+            validated_data['avatar'] = ''
+            validated_data['avatar_thumbnails'] = False
+        with transaction.atomic():
+            user = super().update(instance, validated_data)
+            if picture is not None and not user.avatar_thumbnails:
+                generate_avatar_thumbnails.enqueue(avatar=user.avatar)
+        return user
+
+
+class UserSummaryField(serializers.Field):
+    """
+    Read-only compact representation of a user foreign key, e.g.
+    `host = UserSummaryField(source='host')`. Uses the related object if it
+    was select_related, otherwise resolves the id through the summary cache
+    without touching the users table.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        field = instance._meta.get_field(self.source)
+        if field.is_cached(instance):
+            return field.get_cached_value(instance)
+        return getattr(instance, field.attname)
+
+    def to_representation(self, value):
+        if isinstance(value, User):
+            return summaries.summary_for(value, self.context)
+        return summaries.get_summary(value, self.context)
+
+
+class UserSummaryListSerializer(serializers.ListSerializer):
+    """Resolves the user summaries of every row in one batch before rendering."""
+
+    def to_representation(self, data):
+        items = list(data.all() if hasattr(data, 'all') else data)
+        summary_fields = [
+            field for field in self.child.fields.values() if isinstance(field, UserSummaryField)
+        ]
+        user_ids = set()
+        for item in items:
+            for field in summary_fields:
+                value = field.get_attribute(item)
+                if not isinstance(value, User):
+                    user_ids.add(value)
+        summaries.get_summaries(user_ids, self.context)
+        return super().to_representation(items)
+
 
 class GoogleAuthSerializer(serializers.Serializer):
     token = serializers.CharField()
@@ -60,3 +139,7 @@ class GoogleAuthSerializer(serializers.Serializer):
         # In a real implementation, you would validate the Google token here
         # For now, we'll just return the token
         return value
+
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    token_class = RefreshToken
@@ -0,0 +1,16 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from . import summaries
+from .models import User
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_summary(sender, instance, update_fields=None, **kwargs):
+    # Logins only touch last_login, which isn't part of the summary
+    if update_fields and not set(update_fields) & set(summaries.SUMMARY_FIELDS):
+        return
+    summaries.invalidate(instance.id)
+    # Again once committed: a concurrent read may have cached the old row meanwhile
+    transaction.on_commit(lambda: summaries.invalidate(instance.id))
@@ -0,0 +1,104 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from . import avatars
+
+User = get_user_model()
+
+CACHE_TIMEOUT = 60 * 60 * 24
+# After an invalidation the key holds a marker for this long, so a read that
+# loaded the user before the change committed can't cache the old summary
+INVALIDATED_TIMEOUT = 30
+INVALIDATED = 0
+SUMMARY_FIELDS = ('id', 'username', 'first_name', 'last_name', 'profile_picture', 'avatar', 'avatar_thumbnails')
+
+
+def _cache_key(user_id):
+    return f'accounts:user-summary:v3:{user_id}'
+
+
+def summarize(user):
+    """Compact public representation of a user, as nested in events and comments."""
+    return {
+        'id': user.id,
+        'username': user.username,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'full_name': user.full_name,
+        # Small thumbnail for avatar lists; other sizes are in profile_picture_urls
+        'profile_picture': avatars.url(user),
+        'profile_picture_urls': avatars.urls(user),
+    }
+
+
+def _for_request(data, request):
+    """
+    Cached summaries keep relative picture URLs so they can be shared; each
+    request gets a copy with absolute ones.
+    """
+    if request is None:
+        return data
+    return dict(
+        data,
+        profile_picture=avatars.absolute(data['profile_picture'], request),
+        profile_picture_urls={
+            size: avatars.absolute(url, request) for size, url in data['profile_picture_urls'].items()
+        },
+    )
+
+
+def _identity_map(context):
+    """
+    Summaries already resolved during this request, so a user referenced by
+    many rows (or by several serializers) is looked up once.
+    """
+    request = (context or {}).get('request')
+    if request is None:
+        return {} if context is None else context.setdefault('_user_summaries', {})
+    if not hasattr(request, '_user_summaries'):
+        request._user_summaries = {}
+    return request._user_summaries
+
+
+def get_summaries(user_ids, context=None):
+    """
+    Return {id: summary} for `user_ids`, checking the per-request identity
+    map, then the shared cache with one get_many, then the database with a
+    single query for whatever is still missing.
+    """
+    identity = _identity_map(context)
+    request = (context or {}).get('request')
+    missing = {user_id for user_id in user_ids if user_id is not None and user_id not in identity}
+
+    if missing:
+        cached = cache.get_many([_cache_key(user_id) for user_id in missing])
+        for data in cached.values():
+            if data != INVALIDATED:
+                identity[data['id']] = _for_request(data, request)
+        missing -= identity.keys()
+
+    if missing:
+        for user in User.objects.filter(id__in=missing).only(*SUMMARY_FIELDS):
+            data = summarize(user)
+            identity[user.id] = _for_request(data, request)
+            # add() leaves a fresh invalidation marker in place
+            cache.add(_cache_key(user.id), data, CACHE_TIMEOUT)
+
+    return identity
+
+
+def get_summary(user_id, context=None):
+    return get_summaries([user_id], context).get(user_id)
+
+
+def summary_for(user, context=None):
+    """Summary of an already loaded user; no cache or database access needed."""
+    identity = _identity_map(context)
+    if user.id not in identity:
+        identity[user.id] = _for_request(summarize(user), (context or {}).get('request'))
+    return identity[user.id]
+
+
+def invalidate(user_id):
+    """Drop the cached summary; called whenever a user's public fields change."""
+    cache.set(_cache_key(user_id), INVALIDATED, INVALIDATED_TIMEOUT)
@@ -0,0 +1,14 @@
+from taskqueue.queue import task
+
+from . import avatars
+from .models import User
+
+
+@task
+def generate_avatar_thumbnails(avatar):
+    """Render the thumbnails of an uploaded picture, then switch its users over to them."""
+    avatars.generate_thumbnails(avatar)
+    for user in User.objects.filter(avatar=avatar, avatar_thumbnails=False):
+        user.avatar_thumbnails = True
+        # A regular save so the summary cache and event documents pick up the new URLs
+        user.save(update_fields=['avatar_thumbnails', 'updated_at'])
@@ -0,0 +1,19 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+
+from . import revocation
+
+
+class RefreshToken(BaseRefreshToken):
+    """Refresh token whose blacklist checks go through the revocation cache."""
+
+    def check_blacklist(self):
+        if revocation.is_revoked(self.payload[api_settings.JTI_CLAIM], self.payload['exp']):
+            raise TokenError(_('Token is blacklisted'))
+
+    def blacklist(self):
+        result = super().blacklist()
+        revocation.mark_revoked(self.payload[api_settings.JTI_CLAIM], self.payload['exp'])
+        return result
@@ -6,5 +6,6 @@ urlpatterns = [
     path('login/', views.login_view, name='login'),
     path('google/', views.google_auth_view, name='google_auth'),
     path('profile/', views.UserProfileView.as_view(), name='profile'),
+    path('token/refresh/', views.TokenRefreshView.as_view(), name='token_refresh'),
     path('logout/', views.logout_view, name='logout'),
 ]
@@ -1,10 +1,14 @@
 from rest_framework import status, generics
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.views import TokenRefreshView as BaseTokenRefreshView
 from django.contrib.auth import get_user_model
-from .serializers import UserRegistrationSerializer, UserLoginSerializer, UserSerializer, GoogleAuthSerializer
+from meetup_clone.throttling import LoginThrottle, RegisterThrottle
+from .serializers import (
+    UserRegistrationSerializer, UserLoginSerializer, UserSerializer, GoogleAuthSerializer, TokenRefreshSerializer,
+)
+from .tokens import RefreshToken
 from .models import User
 
 User = get_user_model()
@@ -14,6 +18,7 @@ class UserRegistrationView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = UserRegistrationSerializer
     permission_classes = [AllowAny]
+    throttle_classes = [RegisterThrottle]
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -34,6 +39,7 @@ class UserRegistrationView(generics.CreateAPIView):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([LoginThrottle])
 def login_view(request):
     serializer = UserLoginSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
@@ -83,6 +89,11 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
         return self.request.user
 
 
+class TokenRefreshView(BaseTokenRefreshView):
+    """Issues a new access token and, with rotation, a new refresh token."""
+    serializer_class = TokenRefreshSerializer
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def logout_view(request):
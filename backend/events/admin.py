@@ -1,19 +1,55 @@
 from django.contrib import admin
-from .models import Event, Comment
+from django.db import transaction
+from meetup_clone.pagination import EstimatedCountPaginator
+from . import documents, waitlist
+from .models import Event, EventSeries, Comment, WaitlistEntry
 
 
 @admin.register(Event)
 class EventAdmin(admin.ModelAdmin):
     list_display = ('title', 'host', 'category', 'location', 'date_time', 'attendee_count', 'is_cancelled')
-    list_filter = ('category', 'is_cancelled', 'date_time', 'created_at')
+    list_filter = ('category', 'is_cancelled', 'date_time')
+    list_select_related = ('host',)
     search_fields = ('title', 'description', 'location', 'host__username', 'host__email')
     ordering = ('-date_time',)
-    readonly_fields = ('created_at', 'updated_at', 'attendee_count')
+    readonly_fields = (
+        'created_at', 'updated_at', 'attendee_count', 'waitlist_length', 'comment_count', 'last_comment_at'
+    )
+    autocomplete_fields = ('host', 'attendees')
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
     
     fieldsets = (
         (None, {'fields': ('title', 'description', 'category')}),
         ('Event Details', {'fields': ('location', 'date_time', 'max_attendees')}),
-        ('Host & Attendees', {'fields': ('host', 'attendees', 'attendee_count')}),
+        ('Host & Attendees', {'fields': ('host', 'attendees', 'attendee_count', 'waitlist_length')}),
+        ('Comments', {'fields': ('comment_count', 'last_comment_at')}),
+        ('Status', {'fields': ('is_cancelled',)}),
+        ('Timestamps', {'fields': ('created_at', 'updated_at')}),
+    )
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_attendee_count()
+
+    @admin.display(description='Attendee count', ordering='annotated_attendee_count')
+    def attendee_count(self, obj):
+        return obj.attendee_count
+
+
+@admin.register(EventSeries)
+class EventSeriesAdmin(admin.ModelAdmin):
+    list_display = ('title', 'host', 'category', 'frequency', 'interval', 'start', 'until', 'count', 'is_cancelled')
+    list_filter = ('category', 'frequency', 'is_cancelled')
+    list_select_related = ('host',)
+    search_fields = ('title', 'description', 'location', 'host__username', 'host__email')
+    ordering = ('-start',)
+    readonly_fields = ('created_at', 'updated_at')
+    autocomplete_fields = ('host',)
+
+    fieldsets = (
+        (None, {'fields': ('title', 'description', 'category')}),
+        ('Event Details', {'fields': ('location', 'max_attendees', 'host')}),
+        ('Recurrence', {'fields': ('start', 'frequency', 'interval', 'until', 'count')}),
         ('Status', {'fields': ('is_cancelled',)}),
         ('Timestamps', {'fields': ('created_at', 'updated_at')}),
     )
@@ -23,10 +59,45 @@ class EventAdmin(admin.ModelAdmin):
 class CommentAdmin(admin.ModelAdmin):
     list_display = ('user', 'event', 'text_preview', 'created_at')
     list_filter = ('created_at', 'event__category')
+    list_select_related = ('user', 'event')
     search_fields = ('text', 'user__username', 'user__email', 'event__title')
     ordering = ('-created_at',)
     readonly_fields = ('created_at', 'updated_at')
+    autocomplete_fields = ('event', 'user')
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
     
+    def save_model(self, request, obj, form, change):
+        # The API bumps comment_count itself; admin adds and moves recount
+        event_ids = {obj.event_id, form.initial.get('event')} - {None}
+        super().save_model(request, obj, form, change)
+        Event.objects.filter(id__in=event_ids).recount_comments()
+        documents.refresh(*event_ids)
+
     def text_preview(self, obj):
         return obj.text[:50] + '...' if len(obj.text) > 50 else obj.text
     text_preview.short_description = 'Text Preview'
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    list_display = ('event', 'user', 'position', 'created_at')
+    list_select_related = ('event', 'user')
+    search_fields = ('event__title', 'user__email')
+    ordering = ('event', 'position')
+    # Positions are maintained by events/waitlist.py; edit through the API
+    readonly_fields = ('event', 'user', 'position', 'created_at')
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
+    def has_add_permission(self, request):
+        return False
+
+    def delete_model(self, request, obj):
+        # Go through the waitlist so the positions behind the entry close up
+        with transaction.atomic():
+            waitlist.remove(waitlist.lock(obj.event_id), obj.user)
+
+    def delete_queryset(self, request, queryset):
+        for entry in queryset.select_related('user'):
+            self.delete_model(request, entry)
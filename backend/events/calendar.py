@@ -0,0 +1,161 @@
+"""
+iCalendar (RFC 5545) feeds.
+
+Calendar apps poll subscription URLs every few minutes, so feeds are built to
+make the unchanged case cheap: the view first computes a fingerprint of the
+feed in one aggregate query and answers 304 when the client already has it.
+When it has changed, events are streamed from the database in chunks and each
+VEVENT is served from a cache keyed by the event's id and updated_at, so only
+events edited since the last poll are rendered again.
+"""
+import hashlib
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from .models import CalendarSubscription, Event
+
+PRODID = '-//Meetup Clone//Events//EN'
+# Past events stay in feeds this long so calendars don't drop them right away
+PAST_DAYS = 30
+CACHE_TIMEOUT = 60 * 60 * 24
+CHUNK_SIZE = 500
+
+FEED_FIELDS = (
+    'id', 'title', 'description', 'location', 'location_name', 'latitude', 'longitude',
+    'date_time', 'is_cancelled', 'created_at', 'updated_at',
+)
+
+
+def escape_text(value):
+    return (
+        (value or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def fold(line):
+    """Fold a content line to 75 octets, as the spec requires."""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts = []
+    limit = 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        # Don't split a multi-byte character
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode('utf-8'))
+        encoded = encoded[cut:]
+        limit = 74  # continuation lines start with a space
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def format_datetime(value):
+    return value.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def render_vevent(event):
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:event-{event.id}@meetup-clone',
+        f'DTSTAMP:{format_datetime(event.updated_at)}',
+        f'DTSTART:{format_datetime(event.date_time)}',
+        f'SUMMARY:{escape_text(event.title)}',
+        f'DESCRIPTION:{escape_text(event.description)}',
+        f'STATUS:{"CANCELLED" if event.is_cancelled else "CONFIRMED"}',
+        f'CREATED:{format_datetime(event.created_at)}',
+        f'LAST-MODIFIED:{format_datetime(event.updated_at)}',
+    ]
+    location = event.location_name or event.location
+    if location:
+        lines.append(f'LOCATION:{escape_text(location)}')
+    if event.latitude is not None and event.longitude is not None:
+        lines.append(f'GEO:{event.latitude};{event.longitude}')
+    lines.append('END:VEVENT')
+    return ''.join(fold(line) for line in lines)
+
+
+def _cache_key(event):
+    return f'calendar:vevent:{event.id}:{event.updated_at.timestamp()}'
+
+
+def iter_vevents(queryset, chunk_size=CHUNK_SIZE):
+    """Yield rendered VEVENTs, fetching cached ones with one get_many per chunk."""
+    events = queryset.only(*FEED_FIELDS).order_by('date_time', 'id').iterator(chunk_size=chunk_size)
+    chunk = []
+    for event in events:
+        chunk.append(event)
+        if len(chunk) >= chunk_size:
+            yield from _render_chunk(chunk)
+            chunk = []
+    if chunk:
+        yield from _render_chunk(chunk)
+
+
+def _render_chunk(events):
+    keys = {_cache_key(event): event for event in events}
+    cached = cache.get_many(keys)
+    missing = {}
+    for key, event in keys.items():
+        if key not in cached:
+            missing[key] = cached[key] = render_vevent(event)
+    if missing:
+        cache.set_many(missing, CACHE_TIMEOUT)
+    for key in keys:
+        yield cached[key]
+
+
+def iter_calendar(queryset, name):
+    yield ''.join(fold(line) for line in (
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{escape_text(name)}',
+    ))
+    yield from iter_vevents(queryset)
+    yield 'END:VCALENDAR\r\n'
+
+
+def feed_window_start():
+    return timezone.now() - timedelta(days=PAST_DAYS)
+
+
+def fingerprint(*parts):
+    digest = hashlib.md5('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return f'"{digest}"'
+
+
+def subscription_state(token):
+    """
+    Everything needed to validate a cached copy of a user's feed, in one query:
+    the owner, how many events are in it, the newest edit among them and the
+    last time the user joined or left an event. None for an unknown token.
+    """
+    in_window = Q(user__attending_events__date_time__gte=feed_window_start())
+    return (
+        CalendarSubscription.objects.filter(token=token)
+        .annotate(
+            event_count=Count('user__attending_events', filter=in_window),
+            last_modified=Max('user__attending_events__updated_at', filter=in_window),
+        )
+        .values('user_id', 'attendance_changed_at', 'event_count', 'last_modified')
+        .first()
+    )
+
+
+def user_events(user_id):
+    return Event.objects.filter(attendees=user_id, date_time__gte=feed_window_start())
+
+
+def category_events(category):
+    return Event.objects.filter(category=category, date_time__gte=feed_window_start())
+
+
+def category_state(category):
+    return category_events(category).aggregate(event_count=Count('id'), last_modified=Max('updated_at'))
@@ -0,0 +1,98 @@
+"""
+Read model for the event detail endpoint.
+
+GET /api/events/<id>/ used to rebuild its response from the event, its host,
+the attendee list and several counts on every request. Instead, the rendered
+JSON is stored per event in EventDocument and served as-is with a single
+primary key lookup.
+
+Writes keep the documents current: saving an event (EventSerializer, admin),
+joining or leaving (events/signals.py), waitlist and comment counter updates
+rebuild the event's document once the transaction commits. Profile edits
+drop the documents of the events the user hosts or attends, which are then
+rebuilt on their next read. Dropped documents are kept as empty, expired
+tombstones, and every document records when its data was read, so a
+build-on-read racing a write can't store pre-commit data over a newer
+build. `python manage.py check_event_documents` diffs stored documents
+against freshly serialized data.
+"""
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from meetup_clone.renderers import FastJSONRenderer
+
+from .models import Event, EventDocument
+
+
+def render(event_id):
+    """Serialize the event as the detail endpoint would. Returns (event, body) or (None, None)."""
+    from .serializers import EventSerializer
+
+    event = Event.objects.filter(id=event_id, is_cancelled=False).with_attendee_count().first()
+    if event is None:
+        return None, None
+    body = FastJSONRenderer().render(EventSerializer(event, context={}).data).decode('utf-8')
+    return event, body
+
+
+def _store(event_id, version, **fields):
+    """
+    Write the document unless a newer one (built or invalidated after
+    `version`) is stored. Only existing rows are touched when `fields` is a
+    tombstone, so deleted events don't get a document.
+    """
+    fields['built_at'] = version
+    if EventDocument.objects.filter(event_id=event_id, built_at__lte=version).update(**fields):
+        return
+    if fields['body']:
+        # No document yet; a concurrent or newer one wins
+        EventDocument.objects.bulk_create([EventDocument(event_id=event_id, **fields)], ignore_conflicts=True)
+
+
+def build(event_id):
+    """(Re)build and store the event's document. Returns the body, or None if there is no such event."""
+    # A build-on-read can start before a write commits and finish after the
+    # write's own rebuild, so documents are versioned by when rendering began
+    version = timezone.now()
+    event, body = render(event_id)
+    if event is None:
+        _store(event_id, version, body='', expires_at=version)
+        return None
+    _store(event_id, version, body=body, expires_at=None if event.is_past else event.date_time)
+    return body
+
+
+def get(event_id):
+    """The stored body, or None when missing or expired."""
+    row = EventDocument.objects.filter(event_id=event_id).values_list('body', 'expires_at').first()
+    if row is None:
+        return None
+    body, expires_at = row
+    if expires_at is not None and expires_at <= timezone.now():
+        return None
+    return body
+
+
+def refresh(*event_ids):
+    """Rebuild the documents after the current transaction commits."""
+    for event_id in event_ids:
+        transaction.on_commit(lambda event_id=event_id: build(event_id))
+
+
+def _expire(event_ids):
+    now = timezone.now()
+    # A tombstone rather than a delete, so older builds still in flight can't recreate it
+    EventDocument.objects.filter(event_id__in=event_ids).update(body='', expires_at=now, built_at=now)
+
+
+def invalidate(*event_ids):
+    """Drop the documents once the current transaction commits; they are rebuilt on their next read."""
+    if event_ids:
+        transaction.on_commit(lambda: _expire(event_ids))
+
+
+def invalidate_for_user(user_id):
+    """Drop the documents that embed `user_id`'s summary, as host or attendee."""
+    # Resolved now: a pending attendees clear must not hide the events
+    event_ids = Event.objects.filter(Q(host_id=user_id) | Q(attendees=user_id)).values_list('id', flat=True)
+    invalidate(*set(event_ids))
@@ -0,0 +1,124 @@
+import csv
+import zlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .models import Event, Comment
+
+EXPORT_FORMATS = ('csv', 'ndjson')
+DEFAULT_CHUNK_SIZE = 2000
+
+EXPORT_DATASETS = {
+    'events': {
+        'model': Event,
+        'fields': (
+            'id', 'title', 'description', 'category', 'location', 'latitude', 'longitude',
+            'location_name', 'date_time', 'max_attendees', 'host_id', 'is_cancelled',
+            'created_at', 'updated_at',
+        ),
+        'incremental': True,
+    },
+    'attendees': {
+        'model': Event.attendees.through,
+        'fields': ('id', 'event_id', 'user_id'),
+        # The through table has no timestamps, so it is always exported in full
+        'incremental': False,
+    },
+    'comments': {
+        'model': Comment,
+        'fields': ('id', 'event_id', 'user_id', 'text', 'created_at', 'updated_at'),
+        'incremental': True,
+    },
+}
+
+
+class Echo:
+    """File-like object that hands back what is written, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def watermark():
+    """
+    Upper bound for an incremental export, to pass back as `since` next time.
+
+    updated_at is stamped when a row is saved, not when its transaction
+    commits, so the bound trails the clock by EXPORT_SAFETY_LAG seconds. Any
+    write that commits within that lag of being saved shows up in exactly one
+    export; a transaction held open longer than the lag can be missed.
+    """
+    return timezone.now() - timedelta(seconds=settings.EXPORT_SAFETY_LAG)
+
+
+def export_queryset(dataset, since=None, until=None):
+    config = EXPORT_DATASETS[dataset]
+    queryset = config['model'].objects.all()
+    if config['incremental']:
+        if since:
+            queryset = queryset.filter(updated_at__gt=since)
+        if until:
+            queryset = queryset.filter(updated_at__lte=until)
+    # order_by('pk') avoids the default model ordering, which would force a sort
+    return queryset.order_by('pk').values_list(*config['fields'])
+
+
+def iter_rows(dataset, file_format, since=None, until=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield the export as text chunks, one per row (plus a CSV header).
+    Rows are read through a server-side cursor so memory stays constant.
+    """
+    fields = EXPORT_DATASETS[dataset]['fields']
+    rows = export_queryset(dataset, since, until).iterator(chunk_size=chunk_size)
+
+    if file_format == 'csv':
+        writer = csv.writer(Echo())
+        yield writer.writerow(fields)
+        for row in rows:
+            yield writer.writerow(row)
+    else:
+        encoder = DjangoJSONEncoder(ensure_ascii=False)
+        for row in rows:
+            yield encoder.encode(dict(zip(fields, row))) + '\n'
+
+
+def iter_encoded(chunks, compress=False, flush_size=64 * 1024):
+    """
+    Encode text chunks to bytes, batching small rows into larger writes and
+    optionally gzip-compressing them on the fly.
+    """
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    buffer = []
+    size = 0
+
+    for chunk in chunks:
+        data = chunk.encode('utf-8')
+        buffer.append(data)
+        size += len(data)
+        if size >= flush_size:
+            data = b''.join(buffer)
+            buffer, size = [], 0
+            if compressor:
+                data = compressor.compress(data)
+            if data:
+                yield data
+
+    data = b''.join(buffer)
+    if compressor:
+        data = compressor.compress(data) + compressor.flush()
+    if data:
+        yield data
+
+
+def content_type_for(file_format):
+    if file_format == 'csv':
+        return 'text/csv; charset=utf-8'
+    return 'application/x-ndjson; charset=utf-8'
+
+
+def filename_for(dataset, file_format, compress=False):
+    name = f'{dataset}.{file_format}'
+    return f'{name}.gz' if compress else name
@@ -0,0 +1,93 @@
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+CACHE_TIMEOUT = 60 * 60 * 24 * 7
+MAX_RESULTS = 5
+DEFAULT_WORKERS = 8
+
+_client = None
+
+
+def is_configured():
+    return bool(settings.GOOGLE_MAPS_API_KEY)
+
+
+def get_client():
+    global _client
+    if _client is None:
+        # Imported lazily: googlemaps pulls in requests, which workers and
+        # management commands that never geocode shouldn't pay for at boot
+        import googlemaps
+        _client = googlemaps.Client(key=settings.GOOGLE_MAPS_API_KEY)
+    return _client
+
+
+def _cache_key(query):
+    digest = hashlib.md5(query.strip().lower().encode('utf-8')).hexdigest()
+    return f'geocoding:places:{digest}'
+
+
+def _fetch_places(query):
+    places_result = get_client().places(query)
+    results = []
+    for place in places_result.get('results', [])[:MAX_RESULTS]:
+        results.append({
+            'name': place.get('name', ''),
+            'address': place.get('formatted_address', ''),
+            'lat': place['geometry']['location']['lat'],
+            'lng': place['geometry']['location']['lng'],
+            'place_id': place.get('place_id', ''),
+        })
+    return results
+
+
+def search_places(query):
+    """
+    Search Google Places for `query`, caching the (already trimmed) results
+    so repeated searches and imports of the same location cost nothing.
+    """
+    key = _cache_key(query)
+    results = cache.get(key)
+    if results is None:
+        results = _fetch_places(query)
+        cache.set(key, results, CACHE_TIMEOUT)
+    return results
+
+
+def geocode(location):
+    """Return the best match for `location`, or None."""
+    results = search_places(location)
+    return results[0] if results else None
+
+
+def _geocode_or_none(location):
+    try:
+        return geocode(location)
+    except Exception as e:
+        logger.warning('Geocoding %r failed: %s', location, e)
+        return None
+
+
+def geocode_many(locations, max_workers=DEFAULT_WORKERS):
+    """
+    Resolve many location strings at once. Cache hits are served with a single
+    get_many; the misses are fetched from upstream in parallel.
+    Returns a dict of location -> best match (or None).
+    """
+    locations = {location for location in locations if location}
+    keys = {_cache_key(location): location for location in locations}
+    resolved = {}
+    for key, results in cache.get_many(keys).items():
+        resolved[keys[key]] = results[0] if results else None
+
+    missing = [location for location in locations if location not in resolved]
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as executor:
+            resolved.update(zip(missing, executor.map(_geocode_or_none, missing)))
+    return resolved
@@ -0,0 +1,163 @@
+import csv
+import json
+import time
+from decimal import Decimal
+
+from django.db import transaction
+
+from . import geocoding
+from .models import Event
+from .serializers import EventImportSerializer
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+DEFAULT_CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 100
+
+
+def guess_format(filename):
+    name = (filename or '').lower()
+    if name.endswith('.gz'):
+        name = name[:-3]
+    if name.endswith(('.ndjson', '.jsonl', '.json')):
+        return 'ndjson'
+    return 'csv'
+
+
+def iter_records(lines, file_format):
+    """
+    Stream-parse an iterable of text lines into (line_number, record, error)
+    tuples without reading the whole file into memory.
+    """
+    if file_format == 'csv':
+        reader = csv.DictReader(lines)
+        for record in reader:
+            # Blank CSV cells mean "not provided", not an empty value
+            yield reader.line_num, {k: v for k, v in record.items() if k and v != ''}, None
+        return
+
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f'Invalid JSON: {e}'
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, 'Expected a JSON object'
+            continue
+        yield line_number, record, None
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _dedupe_key(title, date_time, location):
+    return (title, date_time, location or '')
+
+
+def _existing_keys(candidates):
+    titles = {data['title'] for data in candidates}
+    date_times = {data['date_time'] for data in candidates}
+    existing = Event.objects.filter(title__in=titles, date_time__in=date_times)
+    return {
+        _dedupe_key(title, date_time, location)
+        for title, date_time, location in existing.values_list('title', 'date_time', 'location')
+    }
+
+
+def _apply_geocoding(candidates, max_workers):
+    pending = [
+        data for data in candidates
+        if data.get('location') and (data.get('latitude') is None or data.get('longitude') is None)
+    ]
+    if not pending or not geocoding.is_configured():
+        return 0
+
+    resolved = geocoding.geocode_many((data['location'] for data in pending), max_workers=max_workers)
+    geocoded = 0
+    for data in pending:
+        match = resolved.get(data['location'])
+        if not match:
+            continue
+        data['latitude'] = round(Decimal(str(match['lat'])), 6)
+        data['longitude'] = round(Decimal(str(match['lng'])), 6)
+        data.setdefault('location_name', match['name'] or None)
+        geocoded += 1
+    return geocoded
+
+
+def import_chunk(chunk, host, seen, geocode=True, max_workers=geocoding.DEFAULT_WORKERS):
+    """
+    Validate, dedupe, geocode and bulk-insert one chunk of parsed records.
+    `seen` holds the dedupe keys of rows already imported from this file.
+    """
+    started = time.monotonic()
+    stats = {'rows': len(chunk), 'created': 0, 'duplicates': 0, 'invalid': 0, 'geocoded': 0}
+    errors = []
+    candidates = []
+
+    for line_number, record, error in chunk:
+        if error is None:
+            serializer = EventImportSerializer(data=record)
+            if serializer.is_valid():
+                candidates.append(serializer.validated_data)
+                continue
+            error = serializer.errors
+        stats['invalid'] += 1
+        errors.append({'line': line_number, 'errors': error})
+
+    if candidates:
+        existing = _existing_keys(candidates)
+        unique = []
+        for data in candidates:
+            key = _dedupe_key(data['title'], data['date_time'], data.get('location'))
+            if key in existing or key in seen:
+                stats['duplicates'] += 1
+                continue
+            seen.add(key)
+            unique.append(data)
+
+        if geocode:
+            stats['geocoded'] = _apply_geocoding(unique, max_workers)
+
+        with transaction.atomic():
+            created = Event.objects.bulk_create([Event(host=host, **data) for data in unique])
+        stats['created'] = len(created)
+
+    elapsed = time.monotonic() - started
+    stats['seconds'] = round(elapsed, 3)
+    stats['rows_per_second'] = round(len(chunk) / elapsed, 1) if elapsed else None
+    return stats, errors
+
+
+def import_events(lines, file_format, host, chunk_size=DEFAULT_CHUNK_SIZE, geocode=True,
+                  max_workers=geocoding.DEFAULT_WORKERS, on_chunk=None):
+    """
+    Import events from an iterable of CSV or NDJSON text lines in chunks.
+    `on_chunk(number, stats)` is called after each chunk for progress reporting.
+    """
+    summary = {'rows': 0, 'created': 0, 'duplicates': 0, 'invalid': 0, 'geocoded': 0, 'chunks': [], 'errors': []}
+    seen = set()
+
+    records = iter_records(lines, file_format)
+    for number, chunk in enumerate(_chunks(records, chunk_size), start=1):
+        stats, errors = import_chunk(chunk, host, seen, geocode=geocode, max_workers=max_workers)
+        for key in ('rows', 'created', 'duplicates', 'invalid', 'geocoded'):
+            summary[key] += stats[key]
+        summary['chunks'].append(dict(stats, chunk=number))
+        remaining = MAX_REPORTED_ERRORS - len(summary['errors'])
+        summary['errors'].extend(errors[:max(remaining, 0)])
+        if on_chunk:
+            on_chunk(number, stats)
+
+    return summary
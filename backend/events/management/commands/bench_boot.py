@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+# What a worker does before it can serve its first request
+BOOT_CODE = (
+    'import django; django.setup(); '
+    'from django.urls import get_resolver; get_resolver().url_patterns'
+)
+
+
+class Command(BaseCommand):
+    help = 'Measure worker boot time with `python -X importtime` and enforce an import-time budget'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--budget-ms', type=float, default=600,
+                            help='Fail if the fastest boot imports take longer than this')
+        parser.add_argument('--top', type=int, default=15, help='Number of packages to list')
+
+    def boot(self):
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', BOOT_CODE],
+            capture_output=True, text=True, env=os.environ.copy(),
+        )
+        wall = (time.perf_counter() - started) * 1000
+        if result.returncode != 0:
+            raise CommandError(result.stderr.strip().splitlines()[-1])
+        return wall, result.stderr
+
+    def parse(self, output):
+        """Return (total import ms, {top-level package: self ms})."""
+        total = 0
+        packages = defaultdict(float)
+        for line in output.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            fields = line[len('import time:'):].split('|')
+            self_us, cumulative_us, name = int(fields[0]), int(fields[1]), fields[2][1:]
+            packages[name.strip().split('.')[0]] += self_us / 1000
+            # Nested imports are indented; only top-level entries add to the total
+            if not name.startswith(' '):
+                total += cumulative_us / 1000
+        return total, packages
+
+    def handle(self, *args, **options):
+        runs = [self.boot() for _ in range(options['runs'])]
+        wall, output = min(runs)
+        total, packages = self.parse(output)
+
+        self.stdout.write(f"Boot over {options['runs']} runs: fastest {wall:.0f} ms wall, {total:.0f} ms importing")
+        self.stdout.write('Slowest packages (self time):')
+        for name, ms in sorted(packages.items(), key=lambda item: -item[1])[:options['top']]:
+            self.stdout.write(f'  {name:<32} {ms:8.1f} ms')
+
+        if total > options['budget_ms']:
+            raise CommandError(f"Import time {total:.0f} ms exceeds the budget of {options['budget_ms']:.0f} ms")
+        self.stdout.write(self.style.SUCCESS(f"Within the {options['budget_ms']:.0f} ms import budget"))
@@ -0,0 +1,49 @@
+import gzip
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from meetup_clone.middleware import brotli
+from meetup_clone.renderers import FastJSONRenderer, orjson
+
+
+class Command(BaseCommand):
+    help = 'Report encode time and bytes on the wire for the /api/events/ page'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/events/')
+        parser.add_argument('--iterations', type=int, default=200)
+
+    def time_render(self, renderer, data, iterations):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            body = renderer.render(data)
+        return body, (time.perf_counter() - started) / iterations * 1000
+
+    def handle(self, *args, **options):
+        response = APIClient().get(options['path'], HTTP_ACCEPT='application/json', SERVER_NAME='localhost')
+        if response.status_code != 200:
+            self.stderr.write(f"GET {options['path']} returned {response.status_code}")
+            return
+        data = response.data
+        results = data.get('results', data) if isinstance(data, dict) else data
+        self.stdout.write(f"GET {options['path']}: {len(results)} items")
+
+        body, stdlib_ms = self.time_render(JSONRenderer(), data, options['iterations'])
+        self.stdout.write(f'  stdlib json encode: {stdlib_ms:.3f} ms')
+        if orjson is not None:
+            fast_body, fast_ms = self.time_render(FastJSONRenderer(), data, options['iterations'])
+            self.stdout.write(f'  orjson encode:      {fast_ms:.3f} ms ({stdlib_ms / fast_ms:.1f}x faster)')
+            body = fast_body
+        else:
+            self.stdout.write('  orjson encode:      not installed')
+
+        self.stdout.write(f'  identity: {len(body)} bytes')
+        started = time.perf_counter()
+        gzipped = gzip.compress(body)
+        self.stdout.write(f'  gzip:     {len(gzipped)} bytes ({(time.perf_counter() - started) * 1000:.3f} ms)')
+        if brotli is not None:
+            started = time.perf_counter()
+            compressed = brotli.compress(body, quality=4)
+            self.stdout.write(f'  brotli:   {len(compressed)} bytes ({(time.perf_counter() - started) * 1000:.3f} ms)')
@@ -0,0 +1,47 @@
+import time
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIRequestFactory
+from meetup_clone import throttling
+
+
+class Command(BaseCommand):
+    help = 'Measure the per-request overhead of the API throttles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20000)
+        parser.add_argument('--clients', type=int, default=100)
+
+    def run(self, throttle_class, requests, clients):
+        factory = APIRequestFactory()
+        batch = [
+            factory.get('/api/events/search-locations/', REMOTE_ADDR=f'10.0.{i // 256}.{i % 256}')
+            for i in range(clients)
+        ]
+        for request in batch:
+            request.user = None
+        throttle = throttle_class()
+        started = time.perf_counter()
+        for i in range(requests):
+            throttle.allow_request(batch[i % clients], None)
+        return (time.perf_counter() - started) / requests * 1e6
+
+    def handle(self, *args, **options):
+        requests, clients = options['requests'], options['clients']
+
+        class BenchThrottle(throttling.IPThrottle):
+            scope = 'bench'
+
+        rates = {'bench': f'{requests}/hour'}
+        with mock.patch.object(throttling.api_settings, 'DEFAULT_THROTTLE_RATES', rates):
+            throttling.counter = throttling.SlidingWindowCounter()
+            fast = self.run(BenchThrottle, requests, clients)
+            # Disable the local fast path so every hit goes to the shared cache
+            with mock.patch.object(throttling, 'LOCAL_FRACTION', 0):
+                throttling.counter = throttling.SlidingWindowCounter()
+                shared = self.run(BenchThrottle, requests, clients)
+
+        self.stdout.write(f'{requests} requests from {clients} clients')
+        self.stdout.write(f'  with local fast path: {fast:.1f} us/request')
+        self.stdout.write(f'  shared cache only:    {shared:.1f} us/request')
@@ -0,0 +1,43 @@
+import json
+
+from django.core.management.base import BaseCommand
+from events import documents
+from events.models import EventDocument
+
+
+class Command(BaseCommand):
+    help = 'Diff stored event detail documents against freshly serialized events'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help='Rebuild documents that differ')
+        parser.add_argument('--verbose-diff', action='store_true', help='Print the differing fields')
+
+    def handle(self, *args, **options):
+        checked = stale = 0
+        rows = EventDocument.objects.values_list('event_id', 'body').order_by('event_id').iterator(chunk_size=500)
+        for event_id, body in rows:
+            if not body:
+                # Invalidated; rebuilt on the next read
+                continue
+            checked += 1
+            _, live = documents.render(event_id)
+            if live == body:
+                continue
+
+            stale += 1
+            if live is None:
+                self.stdout.write(f'Event {event_id}: document for a cancelled or deleted event')
+            else:
+                stored, current = json.loads(body), json.loads(live)
+                fields = sorted(key for key in stored.keys() | current.keys() if stored.get(key) != current.get(key))
+                self.stdout.write(f"Event {event_id}: {', '.join(fields)} differ")
+                if options['verbose_diff']:
+                    for field in fields:
+                        self.stdout.write(f'    {field}: stored={stored.get(field)!r} live={current.get(field)!r}')
+            if options['fix']:
+                documents.build(event_id)
+
+        summary = f'Checked {checked} documents, {stale} out of date'
+        if options['fix'] and stale:
+            summary += ' (rebuilt)'
+        self.stdout.write(self.style.SUCCESS(summary) if not stale else self.style.WARNING(summary))
@@ -0,0 +1,61 @@
+import gzip
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from events.geocoding import DEFAULT_WORKERS
+from events.importer import DEFAULT_CHUNK_SIZE, IMPORT_FORMATS, guess_format, import_events
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Bulk import events from a CSV or NDJSON file (optionally gzipped)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--host', required=True, help='Email of the user who will host the events')
+        parser.add_argument('--format', dest='file_format', choices=IMPORT_FORMATS,
+                            help='Input format (default: guessed from the file extension)')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                            help='Parallel upstream geocoding requests')
+        parser.add_argument('--no-geocode', action='store_true',
+                            help='Do not resolve locations without coordinates')
+
+    def handle(self, *args, **options):
+        try:
+            host = User.objects.get(email=options['host'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user with email {options['host']}")
+
+        path = options['path']
+        file_format = options['file_format'] or guess_format(path)
+        opener = gzip.open if path.endswith('.gz') else open
+
+        def report(number, stats):
+            self.stdout.write(
+                f"Chunk {number}: {stats['rows']} rows, {stats['created']} created, "
+                f"{stats['duplicates']} duplicates, {stats['invalid']} invalid, "
+                f"{stats['geocoded']} geocoded in {stats['seconds']}s "
+                f"({stats['rows_per_second']} rows/s)"
+            )
+
+        with opener(path, 'rt', encoding='utf-8', newline='') as fh:
+            summary = import_events(
+                fh, file_format, host,
+                chunk_size=options['chunk_size'],
+                geocode=not options['no_geocode'],
+                max_workers=options['workers'],
+                on_chunk=report,
+            )
+
+        for error in summary['errors']:
+            self.stderr.write(f"Line {error['line']}: {json.dumps(error['errors'])}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {summary['created']} of {summary['rows']} rows "
+                f"({summary['duplicates']} duplicates, {summary['invalid']} invalid)"
+            )
+        )
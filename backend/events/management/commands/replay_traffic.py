@@ -0,0 +1,159 @@
+import asyncio
+import json
+import ssl
+import statistics
+import time
+from collections import defaultdict
+from urllib.parse import urlencode, urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class Client:
+    """Minimal asyncio HTTP/1.1 client, one connection per request."""
+
+    def __init__(self, base_url, timeout):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ('http', 'https'):
+            raise CommandError(f'Unsupported base URL: {base_url}')
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.ssl = ssl.create_default_context() if parts.scheme == 'https' else None
+        self.netloc = parts.netloc
+        self.prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+
+    async def request(self, method, target, headers, body=None):
+        lines = [f'{method} {self.prefix}{target} HTTP/1.1', f'Host: {self.netloc}', 'Connection: close']
+        lines += [f'{key}: {value}' for key, value in headers.items()]
+        if body is not None:
+            lines += ['Content-Type: application/json', f'Content-Length: {len(body)}']
+        payload = ('\r\n'.join(lines) + '\r\n\r\n').encode() + (body or b'')
+
+        async def exchange():
+            reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+            try:
+                writer.write(payload)
+                await writer.drain()
+                status_line = await reader.readline()
+                # Drain the response so timings include the full body
+                await reader.read()
+            finally:
+                writer.close()
+            return int(status_line.split()[1])
+
+        return await asyncio.wait_for(exchange(), self.timeout)
+
+
+class Command(BaseCommand):
+    help = 'Replay a captured traffic log (see TRAFFIC_CAPTURE_RATE) against a running server'
+
+    def add_arguments(self, parser):
+        parser.add_argument('log')
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--speed', type=float, default=1.0, help='Replay rate as a multiple of the recorded rate')
+        parser.add_argument('--concurrency', type=int, default=50, help='Maximum requests in flight')
+        parser.add_argument('--timeout', type=float, default=30.0)
+        parser.add_argument('--limit', type=int, help='Only replay the first N records')
+        parser.add_argument('--token', action='append', default=[], help='JWT access token, may be repeated')
+        parser.add_argument('--tokens-file', help='File with one access token per line')
+
+    def load(self, path, limit):
+        try:
+            with open(path, encoding='utf-8') as log:
+                records = [json.loads(line) for line in log if line.strip()]
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Could not read {path}: {e}')
+        records.sort(key=lambda record: record['t'])
+        return records[:limit] if limit else records
+
+    def build_request(self, record, tokens, assigned):
+        target = record['path']
+        if record['q']:
+            target += '?' + urlencode(record['q'])
+        headers = {'Accept': 'application/json', 'Accept-Encoding': 'gzip'}
+        if record['auth'] != 'anon' and tokens:
+            # Each recorded client keeps one token so per-user behaviour is preserved
+            if record['client'] not in assigned:
+                assigned[record['client']] = tokens[len(assigned) % len(tokens)]
+            headers['Authorization'] = f"Bearer {assigned[record['client']]}"
+        body = json.dumps(record['body']).encode() if 'body' in record else None
+        return target, headers, body
+
+    async def replay(self, client, records, tokens, speed, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+        results = defaultdict(list)
+        errors = defaultdict(int)
+        lag = []
+        assigned = {}
+        origin = records[0]['t']
+        started = time.perf_counter()
+
+        async def send(record, due):
+            target, headers, body = self.build_request(record, tokens, assigned)
+            async with semaphore:
+                lag.append(time.perf_counter() - due)
+                sent = time.perf_counter()
+                try:
+                    status = await client.request(record['m'], target, headers, body)
+                except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+                    status = None
+                elapsed = time.perf_counter() - sent
+            route = record['route'] or record['path']
+            results[route].append(elapsed)
+            if status is None or status >= 500 or (status >= 400 and record['status'] < 400):
+                errors[route] += 1
+
+        tasks = []
+        for record in records:
+            due = started + (record['t'] - origin) / speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(send(record, due)))
+        await asyncio.gather(*tasks)
+        return results, errors, lag, time.perf_counter() - started
+
+    def handle(self, *args, **options):
+        tokens = list(options['token'])
+        if options['tokens_file']:
+            with open(options['tokens_file'], encoding='utf-8') as f:
+                tokens += [line.strip() for line in f if line.strip()]
+
+        records = self.load(options['log'], options['limit'])
+        # Secret URL segments were masked at capture time and cannot be replayed
+        skipped = sum(1 for record in records if '{' in record['path'])
+        records = [record for record in records if '{' not in record['path']]
+        if not records:
+            raise CommandError('Nothing to replay')
+        if not tokens and any(record['auth'] != 'anon' for record in records):
+            self.stderr.write('No --token given: authenticated requests will be sent anonymously')
+
+        client = Client(options['base_url'], options['timeout'])
+        results, errors, lag, duration = asyncio.run(
+            self.replay(client, records, tokens, options['speed'], options['concurrency'])
+        )
+
+        recorded = defaultdict(list)
+        for record in records:
+            recorded[record['route'] or record['path']].append(record['ms'])
+
+        self.stdout.write(
+            f'{len(records)} requests in {duration:.1f}s ({len(records) / duration:.1f} req/s), '
+            f'{skipped} skipped, max scheduling lag {max(lag) * 1000:.0f} ms'
+        )
+        self.stdout.write(
+            f"{'route':40} {'count':>6} {'p50':>8} {'p90':>8} {'p99':>8} {'rec p50':>8} {'errors':>7}"
+        )
+        for route, latencies in sorted(results.items(), key=lambda item: -len(item[1])):
+            ms = [value * 1000 for value in latencies]
+            self.stdout.write(
+                f'{route[:40]:40} {len(ms):>6} {percentile(ms, 0.5):>8.1f} {percentile(ms, 0.9):>8.1f} '
+                f'{percentile(ms, 0.99):>8.1f} {statistics.median(recorded[route]):>8.1f} '
+                f'{errors[route] / len(ms):>7.1%}'
+            )
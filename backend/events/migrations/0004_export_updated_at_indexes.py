@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0003_alter_event_location'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['updated_at'], name='events_comm_updated_5b064e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['updated_at'], name='events_even_updated_1878aa_idx'),
+        ),
+    ]
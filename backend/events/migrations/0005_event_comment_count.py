@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:31
+
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_comment_stats(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    Comment = apps.get_model('events', 'Comment')
+    comments = Comment.objects.filter(event=OuterRef('pk')).order_by().values('event')
+    Event.objects.update(
+        comment_count=Coalesce(Subquery(comments.annotate(n=Count('id')).values('n')), 0),
+        last_comment_at=Subquery(comments.annotate(last=Max('created_at')).values('last')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0004_export_updated_at_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='last_comment_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['event', '-created_at'], name='events_comm_event_i_09c51b_idx'),
+        ),
+        migrations.RunPython(backfill_comment_stats, migrations.RunPython.noop),
+    ]
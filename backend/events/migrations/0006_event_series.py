@@ -0,0 +1,57 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:36
+
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('events', '0005_event_comment_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField()),
+                ('category', models.CharField(choices=[('tech', 'Technology'), ('business', 'Business'), ('social', 'Social'), ('education', 'Education'), ('health', 'Health & Wellness'), ('arts', 'Arts & Culture'), ('sports', 'Sports & Fitness'), ('food', 'Food & Drink'), ('travel', 'Travel'), ('other', 'Other')], max_length=20)),
+                ('location', models.CharField(blank=True, max_length=200, null=True)),
+                ('latitude', models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True)),
+                ('longitude', models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True)),
+                ('location_name', models.CharField(blank=True, max_length=200, null=True)),
+                ('max_attendees', models.PositiveIntegerField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(1)])),
+                ('start', models.DateTimeField()),
+                ('frequency', models.CharField(choices=[('daily', 'Daily'), ('weekly', 'Weekly'), ('monthly', 'Monthly')], default='weekly', max_length=10)),
+                ('interval', models.PositiveIntegerField(default=1, validators=[django.core.validators.MinValueValidator(1)])),
+                ('until', models.DateTimeField(blank=True, null=True)),
+                ('count', models.PositiveIntegerField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(1)])),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_cancelled', models.BooleanField(default=False)),
+            ],
+            options={
+                'verbose_name_plural': 'event series',
+                'ordering': ['start'],
+            },
+        ),
+        migrations.AddField(
+            model_name='eventseries',
+            name='host',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hosted_series', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='series',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='occurrences', to='events.eventseries'),
+        ),
+        migrations.AddConstraint(
+            model_name='event',
+            constraint=models.UniqueConstraint(fields=('series', 'date_time'), name='unique_series_occurrence'),
+        ),
+    ]
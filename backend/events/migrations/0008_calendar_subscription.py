@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:43
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import events.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('events', '0007_event_waitlist'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalendarSubscription',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(default=events.models.new_calendar_token, max_length=64, unique=True)),
+                ('attendance_changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['category', 'date_time'], name='events_even_categor_19cbcf_idx'),
+        ),
+        migrations.AddField(
+            model_name='calendarsubscription',
+            name='user',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='calendar_subscription', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
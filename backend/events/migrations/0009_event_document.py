@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0008_calendar_subscription'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventDocument',
+            fields=[
+                ('event', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='document', serialize=False, to='events.event')),
+                ('body', models.TextField()),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+                ('built_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:01
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0009_event_document'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='eventdocument',
+            name='built_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -1,25 +1,111 @@
+import secrets
+
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 User = get_user_model()
 
 
-class Event(models.Model):
-    CATEGORY_CHOICES = [
-        ('tech', 'Technology'),
-        ('business', 'Business'),
-        ('social', 'Social'),
-        ('education', 'Education'),
-        ('health', 'Health & Wellness'),
-        ('arts', 'Arts & Culture'),
-        ('sports', 'Sports & Fitness'),
-        ('food', 'Food & Drink'),
-        ('travel', 'Travel'),
-        ('other', 'Other'),
+CATEGORY_CHOICES = [
+    ('tech', 'Technology'),
+    ('business', 'Business'),
+    ('social', 'Social'),
+    ('education', 'Education'),
+    ('health', 'Health & Wellness'),
+    ('arts', 'Arts & Culture'),
+    ('sports', 'Sports & Fitness'),
+    ('food', 'Food & Drink'),
+    ('travel', 'Travel'),
+    ('other', 'Other'),
+]
+
+
+class EventQuerySet(models.QuerySet):
+    def with_attendee_count(self):
+        """Count attendees in the same query instead of one COUNT per event."""
+        return self.annotate(annotated_attendee_count=models.Count('attendees', distinct=True))
+
+    def recount_comments(self):
+        """Recompute comment_count and last_comment_at from the comments themselves."""
+        comments = Comment.objects.filter(event_id=models.OuterRef('pk')).order_by()
+        return self.update(
+            comment_count=Coalesce(models.Subquery(
+                comments.values('event_id').annotate(total=models.Count('id')).values('total')
+            ), 0),
+            last_comment_at=models.Subquery(comments.order_by('-created_at').values('created_at')[:1]),
+        )
+
+
+class EventSeries(models.Model):
+    """
+    A recurring event. Occurrences are generated from the rule on demand and
+    only stored as Event rows once someone joins or comments on them.
+    """
+    FREQUENCY_DAILY = 'daily'
+    FREQUENCY_WEEKLY = 'weekly'
+    FREQUENCY_MONTHLY = 'monthly'
+    FREQUENCY_CHOICES = [
+        (FREQUENCY_DAILY, 'Daily'),
+        (FREQUENCY_WEEKLY, 'Weekly'),
+        (FREQUENCY_MONTHLY, 'Monthly'),
+    ]
+    # Copied onto each occurrence when it is built or materialized
+    OCCURRENCE_FIELDS = [
+        'title', 'description', 'category', 'location', 'latitude', 'longitude', 'location_name',
+        'max_attendees', 'host_id',
     ]
 
+    title = models.CharField(max_length=200)
+    description = models.TextField()
+    category = models.CharField(max_length=20, choices=CATEGORY_CHOICES)
+    location = models.CharField(max_length=200, null=True, blank=True)
+    latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    location_name = models.CharField(max_length=200, null=True, blank=True)
+    max_attendees = models.PositiveIntegerField(
+        validators=[MinValueValidator(1)],
+        null=True,
+        blank=True
+    )
+    host = models.ForeignKey(User, on_delete=models.CASCADE, related_name='hosted_series')
+    # First occurrence; later ones are start + k * interval * frequency
+    start = models.DateTimeField()
+    frequency = models.CharField(max_length=10, choices=FREQUENCY_CHOICES, default=FREQUENCY_WEEKLY)
+    interval = models.PositiveIntegerField(default=1, validators=[MinValueValidator(1)])
+    until = models.DateTimeField(null=True, blank=True)
+    count = models.PositiveIntegerField(null=True, blank=True, validators=[MinValueValidator(1)])
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    is_cancelled = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ['start']
+        verbose_name_plural = 'event series'
+
+    def __str__(self):
+        return self.title
+
+    def save(self, *args, **kwargs):
+        # Occurrences are addressed by whole-second timestamps
+        self.start = self.start.replace(microsecond=0)
+        super().save(*args, **kwargs)
+
+    def occurrence_fields(self):
+        return {field: getattr(self, field) for field in self.OCCURRENCE_FIELDS}
+
+    def build_occurrence(self, when):
+        """An unsaved Event standing in for the occurrence at `when`."""
+        event = Event(series=self, date_time=when, **self.occurrence_fields())
+        event.annotated_attendee_count = 0
+        return event
+
+
+class Event(models.Model):
+    CATEGORY_CHOICES = CATEGORY_CHOICES
+
     title = models.CharField(max_length=200)
     description = models.TextField()
     category = models.CharField(max_length=20, choices=CATEGORY_CHOICES)
@@ -38,15 +124,46 @@ class Event(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_cancelled = models.BooleanField(default=False)
+    # Set on occurrences materialized from a recurring series
+    series = models.ForeignKey(
+        EventSeries, on_delete=models.CASCADE, related_name='occurrences', null=True, blank=True
+    )
+    # Bumped by the comment API on create and recounted whenever a comment is
+    # deleted or edited in the admin; see events/signals.py
+    comment_count = models.PositiveIntegerField(default=0)
+    last_comment_at = models.DateTimeField(null=True, blank=True)
+    # Waitlist positions handed out so far, and how many of them were promoted;
+    # see events/waitlist.py
+    waitlist_tail = models.PositiveIntegerField(default=0)
+    waitlist_head = models.PositiveIntegerField(default=0)
+
+    objects = EventQuerySet.as_manager()
 
     class Meta:
         ordering = ['date_time']
+        indexes = [
+            models.Index(fields=['updated_at']),
+            models.Index(fields=['category', 'date_time']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['series', 'date_time'], name='unique_series_occurrence'),
+        ]
 
     def __str__(self):
         return self.title
 
+    @property
+    def occurrence(self):
+        """Timestamp identifying this event within its series, if any."""
+        if self.series_id is None:
+            return None
+        return int(self.date_time.timestamp())
+
     @property
     def attendee_count(self):
+        annotated = getattr(self, 'annotated_attendee_count', None)
+        if annotated is not None:
+            return annotated
         return self.attendees.count()
 
     @property
@@ -59,6 +176,29 @@ class Event(models.Model):
     def is_past(self):
         return self.date_time < timezone.now()
 
+    @property
+    def waitlist_length(self):
+        return self.waitlist_tail - self.waitlist_head
+
+
+class WaitlistEntry(models.Model):
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='waitlist')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='waitlist_entries')
+    # Dense per event: the entry at waitlist_head + 1 is next in line
+    position = models.IntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['event', 'position']
+        verbose_name_plural = 'waitlist entries'
+        constraints = [
+            models.UniqueConstraint(fields=['event', 'position'], name='unique_waitlist_position'),
+            models.UniqueConstraint(fields=['event', 'user'], name='unique_waitlist_user'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.event.title} (#{self.position})"
+
 
 class Comment(models.Model):
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='comments')
@@ -69,6 +209,42 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['updated_at']),
+            models.Index(fields=['event', '-created_at']),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.event.title}"
+
+
+def new_calendar_token():
+    return secrets.token_urlsafe(24)
+
+
+class CalendarSubscription(models.Model):
+    """Secret token behind a user's iCalendar feed of the events they attend."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='calendar_subscription')
+    token = models.CharField(max_length=64, unique=True, default=new_calendar_token)
+    # Bumped whenever the user joins or leaves an event, see events/signals.py
+    attendance_changed_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Calendar for {self.user_id}"
+
+
+class EventDocument(models.Model):
+    """
+    Precomputed JSON body of the event detail endpoint, rebuilt whenever
+    something it shows changes; see events/documents.py.
+    """
+    event = models.OneToOneField(Event, on_delete=models.CASCADE, primary_key=True, related_name='document')
+    body = models.TextField()
+    # is_past in the body flips once the event starts, so the document expires then
+    expires_at = models.DateTimeField(null=True, blank=True)
+    # When the data in `body` was read; a build never replaces a newer document
+    built_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Document for {self.event_id}"
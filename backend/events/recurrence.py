@@ -0,0 +1,154 @@
+"""
+Recurring event series.
+
+An EventSeries stores a recurrence rule instead of one Event row per
+occurrence. Occurrences inside a requested window are computed on the fly and
+merged into the feed; a concrete Event row is only materialized when someone
+joins or comments on an occurrence.
+"""
+import calendar
+import heapq
+from datetime import timedelta
+from itertools import islice
+
+
+def add_months(value, months):
+    month_index = value.month - 1 + months
+    year = value.year + month_index // 12
+    month = month_index % 12 + 1
+    day = min(value.day, calendar.monthrange(year, month)[1])
+    return value.replace(year=year, month=month, day=day)
+
+
+class Recurrence:
+    """Maps occurrence indexes to datetimes for one series, in O(1) per lookup."""
+
+    def __init__(self, series):
+        self.series = series
+
+    def at(self, index):
+        series = self.series
+        if series.frequency == series.FREQUENCY_MONTHLY:
+            return add_months(series.start, index * series.interval)
+        return series.start + index * self.step
+
+    @property
+    def step(self):
+        days = 7 if self.series.frequency == self.series.FREQUENCY_WEEKLY else 1
+        return timedelta(days=days * self.series.interval)
+
+    def _estimate_index(self, value):
+        series = self.series
+        if series.frequency == series.FREQUENCY_MONTHLY:
+            months = (value.year - series.start.year) * 12 + value.month - series.start.month
+            return months // series.interval
+        return (value - series.start) // self.step
+
+    def first_index_from(self, value):
+        """Smallest index whose occurrence is at or after `value`."""
+        index = max(self._estimate_index(value), 0)
+        while index > 0 and self.at(index - 1) >= value:
+            index -= 1
+        while self.at(index) < value:
+            index += 1
+        return index
+
+    def last_index(self):
+        """Index of the final occurrence, or None for an open-ended series."""
+        series = self.series
+        last = None
+        if series.count:
+            last = series.count - 1
+        if series.until:
+            if series.until < series.start:
+                return -1
+            until_index = self.first_index_from(series.until)
+            if self.at(until_index) > series.until:
+                until_index -= 1
+            last = until_index if last is None else min(last, until_index)
+        return last
+
+    def index_range(self, start, end):
+        """range() of occurrence indexes within [start, end]."""
+        first = self.first_index_from(start)
+        last = self.first_index_from(end)
+        if self.at(last) > end:
+            last -= 1
+        final = self.last_index()
+        if final is not None:
+            last = min(last, final)
+        return range(first, last + 1)
+
+    def is_occurrence(self, value):
+        index = self.first_index_from(value)
+        final = self.last_index()
+        return self.at(index) == value and (final is None or index <= final)
+
+
+def iter_occurrences(series, start, end, reverse=False, exclude=frozenset()):
+    """Lazily yield virtual Events for `series` within [start, end]."""
+    recurrence = Recurrence(series)
+    indexes = recurrence.index_range(start, end)
+    for index in (reversed(indexes) if reverse else indexes):
+        when = recurrence.at(index)
+        if (series.id, when) not in exclude:
+            yield series.build_occurrence(when)
+
+
+def count_occurrences(series, start, end):
+    return len(Recurrence(series).index_range(start, end))
+
+
+class MergedFeed:
+    """
+    Sliceable, countable view over one-off events plus series occurrences,
+    merged in date_time order. Only as many rows and occurrences as the
+    requested slice needs are produced, so it can be handed to a paginator.
+    """
+
+    def __init__(self, queryset, series_list, start, end, reverse=False):
+        from .models import Event
+
+        self.queryset = queryset
+        self.series_list = series_list
+        self.start = start
+        self.end = end
+        self.reverse = reverse
+        # Occurrences that already exist as Event rows come from the queryset
+        self.materialized = set(
+            Event.objects.filter(series__in=series_list, date_time__range=(start, end))
+            .values_list('series_id', 'date_time')
+        )
+
+    def count(self):
+        occurrences = sum(count_occurrences(series, self.start, self.end) for series in self.series_list)
+        # Rows left on old dates by a rescheduled series don't hide any occurrence;
+        # cancelled or filtered-out rows still do, though the queryset skips them
+        recurrences = {series.id: Recurrence(series) for series in self.series_list}
+        shadowed = sum(
+            1 for series_id, when in self.materialized if recurrences[series_id].is_occurrence(when)
+        )
+        return self.queryset.count() + occurrences - shadowed
+
+    def _merge(self, stop):
+        streams = [self.queryset[:stop].iterator()] if stop is not None else [self.queryset.iterator()]
+        streams += [
+            iter_occurrences(series, self.start, self.end, self.reverse, self.materialized)
+            for series in self.series_list
+        ]
+        return heapq.merge(*streams, key=lambda event: event.date_time, reverse=self.reverse)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return list(islice(self._merge(key.stop), key.start, key.stop))
+        return next(islice(self._merge(key + 1), key, None))
+
+
+def materialize(series, when):
+    """Return the concrete Event for the occurrence at `when`, creating it once."""
+    from .models import Event
+
+    # get_or_create falls back to a get when a concurrent request wins the
+    # unique (series, date_time) race
+    event, _ = Event.objects.get_or_create(series=series, date_time=when, defaults=series.occurrence_fields())
+    return event
@@ -1,51 +1,133 @@
+from django.db import transaction
 from rest_framework import serializers
-from .models import Event, Comment
-from accounts.serializers import UserSerializer
+from .models import Event, EventSeries, Comment
+from accounts import summaries
+from accounts.serializers import UserSummaryField, UserSummaryListSerializer
+from .tasks import geocode_event
+from . import waitlist
+
+# Kept current by the waitlist and comment code; the full save() of an update
+# must write back the locked row's values, not the ones loaded before the lock
+COUNTER_FIELDS = ('waitlist_head', 'waitlist_tail', 'comment_count', 'last_comment_at')
 
 
 class EventSerializer(serializers.ModelSerializer):
-    host = UserSerializer(read_only=True)
-    attendees = UserSerializer(many=True, read_only=True)
+    host = UserSummaryField()
+    attendees = serializers.SerializerMethodField()
     attendee_count = serializers.ReadOnlyField()
     is_full = serializers.ReadOnlyField()
     is_past = serializers.ReadOnlyField()
+    occurrence = serializers.ReadOnlyField()
+    waitlist_length = serializers.ReadOnlyField()
 
     class Meta:
         model = Event
         fields = [
             'id', 'title', 'description', 'category', 'location', 'latitude', 'longitude', 'location_name',
             'date_time', 'max_attendees', 'host', 'attendees', 'attendee_count', 'is_full',
-            'is_past', 'created_at', 'updated_at', 'is_cancelled'
+            'waitlist_length', 'is_past', 'comment_count', 'last_comment_at', 'series', 'occurrence', 'created_at', 'updated_at',
+            'is_cancelled'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'comment_count', 'last_comment_at', 'series', 'created_at', 'updated_at']
+
+    def get_attendees(self, obj):
+        # Read ids straight from the through table and resolve them via the summary cache
+        user_ids = list(
+            Event.attendees.through.objects.filter(event_id=obj.id).order_by('id').values_list('user_id', flat=True)
+        )
+        resolved = summaries.get_summaries(user_ids, self.context)
+        return [resolved[user_id] for user_id in user_ids if user_id in resolved]
 
     def create(self, validated_data):
         validated_data['host'] = self.context['request'].user
-        return super().create(validated_data)
+        event = super().create(validated_data)
+        if event.location and (event.latitude is None or event.longitude is None):
+            geocode_event.enqueue(event_id=event.id)
+        return event
+
+    def update(self, instance, validated_data):
+        relocated = (
+            'location' in validated_data
+            and validated_data['location'] != instance.location
+            and 'latitude' not in validated_data
+            and 'longitude' not in validated_data
+        )
+        if relocated:
+            # The old coordinates no longer match; resolve the new location off-request
+            validated_data['latitude'] = None
+            validated_data['longitude'] = None
+        with transaction.atomic():
+            # Lock the row before the capacity changes so a concurrent join
+            # can't take a new seat ahead of the waitlist
+            locked = waitlist.lock(instance.id)
+            for field in COUNTER_FIELDS:
+                setattr(instance, field, getattr(locked, field))
+            capacity = validated_data.get('max_attendees', locked.max_attendees)
+            grew = locked.max_attendees is not None and (capacity is None or capacity > locked.max_attendees)
+            event = super().update(instance, validated_data)
+            # New seats go to the waitlist first
+            if grew and waitlist.promote(event):
+                # The annotated count predates the promotions
+                event.annotated_attendee_count = None
+        if relocated and event.location:
+            geocode_event.enqueue(event_id=event.id)
+        return event
 
 
 class EventListSerializer(serializers.ModelSerializer):
-    host = UserSerializer(read_only=True)
+    """
+    Also renders virtual series occurrences, which have no id yet; clients
+    address those by `series` and `occurrence` until they are materialized.
+    """
+    host = UserSummaryField()
     attendee_count = serializers.ReadOnlyField()
     is_full = serializers.ReadOnlyField()
     is_past = serializers.ReadOnlyField()
+    occurrence = serializers.ReadOnlyField()
+    waitlist_length = serializers.ReadOnlyField()
 
     class Meta:
         model = Event
         fields = [
             'id', 'title', 'description', 'category', 'location', 'latitude', 'longitude', 'location_name',
-            'date_time', 'max_attendees', 'host', 'attendee_count', 'is_full', 'is_past',
-            'created_at', 'is_cancelled'
+            'date_time', 'max_attendees', 'host', 'attendee_count', 'is_full', 'waitlist_length', 'is_past',
+            'comment_count', 'last_comment_at', 'series', 'occurrence', 'created_at', 'is_cancelled'
         ]
+        list_serializer_class = UserSummaryListSerializer
+
+
+class EventSeriesSerializer(serializers.ModelSerializer):
+    host = UserSummaryField()
+
+    class Meta:
+        model = EventSeries
+        fields = [
+            'id', 'title', 'description', 'category', 'location', 'latitude', 'longitude', 'location_name',
+            'max_attendees', 'host', 'start', 'frequency', 'interval', 'until', 'count',
+            'created_at', 'updated_at', 'is_cancelled'
+        ]
+        read_only_fields = ['id', 'created_at', 'updated_at']
+
+    def validate(self, attrs):
+        start = attrs.get('start', getattr(self.instance, 'start', None))
+        until = attrs.get('until', getattr(self.instance, 'until', None))
+        if until and start and until < start:
+            raise serializers.ValidationError({'until': 'Must not be before the series start'})
+        return attrs
+
+    def create(self, validated_data):
+        validated_data['host'] = self.context['request'].user
+        return super().create(validated_data)
 
 
 class CommentSerializer(serializers.ModelSerializer):
-    user = UserSerializer(read_only=True)
+    user = UserSummaryField()
 
     class Meta:
         model = Comment
         fields = ['id', 'text', 'user', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
+        list_serializer_class = UserSummaryListSerializer
 
     def create(self, validated_data):
         validated_data['user'] = self.context['request'].user
@@ -63,13 +145,24 @@ class EventJoinSerializer(serializers.Serializer):
         if event.is_cancelled:
             raise serializers.ValidationError("Cannot join cancelled events")
         
-        if event.is_full:
-            raise serializers.ValidationError("Event is full")
-        
         if event.attendees.filter(id=user.id).exists():
             raise serializers.ValidationError("Already attending this event")
         
+        if event.waitlist.filter(user=user).exists():
+            raise serializers.ValidationError("Already on the waitlist for this event")
+        
         if event.host == user:
             raise serializers.ValidationError("Cannot join your own event")
         
         return attrs
+
+
+class EventImportSerializer(serializers.ModelSerializer):
+    """Validates one row of a bulk event import; the host is supplied by the importer."""
+
+    class Meta:
+        model = Event
+        fields = [
+            'title', 'description', 'category', 'location', 'latitude', 'longitude', 'location_name',
+            'date_time', 'max_attendees', 'is_cancelled'
+        ]
@@ -0,0 +1,86 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from accounts import summaries
+from . import documents, waitlist
+from .models import CalendarSubscription, Comment, Event, WaitlistEntry
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Event)
+def refresh_event_document(sender, instance, **kwargs):
+    documents.refresh(instance.id)
+
+
+@receiver(post_delete, sender=Comment)
+def recount_event_comments(sender, instance, **kwargs):
+    # Recount rather than decrement: admin deletes and user/event cascades
+    # land here too, and a concurrent double delete must not count twice
+    Event.objects.filter(id=instance.event_id).recount_comments()
+    documents.refresh(instance.event_id)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_documents(sender, instance, created=False, update_fields=None, **kwargs):
+    # Same rule as the summary cache: only public profile fields matter
+    if created or (update_fields and not set(update_fields) & set(summaries.SUMMARY_FIELDS)):
+        return
+    documents.invalidate_for_user(instance.id)
+
+
+@receiver(m2m_changed, sender=Event.attendees.through)
+def refresh_attendance_documents(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            documents.refresh(instance.pk)
+    elif action in ('post_add', 'post_remove'):
+        documents.refresh(*pk_set)
+    elif action == 'pre_clear':
+        documents.invalidate_for_user(instance.pk)
+
+
+@receiver(m2m_changed, sender=Event.attendees.through)
+def touch_calendar_subscriptions(sender, instance, action, reverse, pk_set, **kwargs):
+    # Joining or leaving doesn't change Event.updated_at, so record it for the
+    # calendar feeds' ETag instead
+    if action == 'pre_clear':
+        if reverse:
+            instance._cleared_attendees = [instance.pk]
+        else:
+            instance._cleared_attendees = list(
+                sender.objects.filter(event_id=instance.pk).values_list('user_id', flat=True)
+            )
+        return
+    if action == 'post_clear':
+        user_ids = getattr(instance, '_cleared_attendees', [])
+    elif action in ('post_add', 'post_remove'):
+        user_ids = [instance.pk] if reverse else list(pk_set or [])
+    else:
+        return
+    if user_ids:
+        CalendarSubscription.objects.filter(user_id__in=user_ids).update(attendance_changed_at=timezone.now())
+
+
+@receiver(pre_delete, sender=User)
+def release_waitlist_places(sender, instance, **kwargs):
+    # The cascade would drop the user's entries without closing the queue up
+    for event_id in list(WaitlistEntry.objects.filter(user=instance).values_list('event_id', flat=True)):
+        waitlist.remove(waitlist.lock(event_id), instance)
+
+    # ...and free their seats without promoting anyone into them
+    event_ids = list(instance.attending_events.values_list('id', flat=True))
+
+    def promote():
+        for event_id in event_ids:
+            with transaction.atomic():
+                try:
+                    waitlist.promote(waitlist.lock(event_id))
+                except Event.DoesNotExist:
+                    pass
+
+    if event_ids:
+        transaction.on_commit(promote)
@@ -0,0 +1,34 @@
+from decimal import Decimal
+
+from django.utils import timezone
+from taskqueue.queue import task
+
+from . import documents, geocoding
+from .models import Event
+
+
+@task
+def geocode_event(event_id):
+    """Resolve an event's location string to coordinates after it was saved."""
+    event = Event.objects.filter(id=event_id).only('location', 'location_name', 'latitude', 'longitude').first()
+    if event is None or not event.location:
+        return
+    if event.latitude is not None and event.longitude is not None:
+        return
+    if not geocoding.is_configured():
+        return
+
+    # Upstream errors propagate so the queue retries with backoff
+    match = geocoding.geocode(event.location)
+    if not match:
+        return
+
+    # Guard on location so a concurrent edit isn't overwritten with stale coordinates
+    updated = Event.objects.filter(id=event_id, location=event.location).update(
+        latitude=round(Decimal(str(match['lat'])), 6),
+        longitude=round(Decimal(str(match['lng'])), 6),
+        location_name=event.location_name or match['name'] or None,
+        updated_at=timezone.now(),
+    )
+    if updated:
+        documents.refresh(event_id)
@@ -6,7 +6,19 @@ urlpatterns = [
     path('<int:pk>/', views.EventDetailView.as_view(), name='event-detail'),
     path('<int:event_id>/join/', views.join_event, name='join-event'),
     path('<int:event_id>/leave/', views.leave_event, name='leave-event'),
+    path('<int:event_id>/waitlist/', views.event_waitlist, name='event-waitlist'),
     path('<int:event_id>/comments/', views.CommentListCreateView.as_view(), name='comment-list-create'),
     path('<int:event_id>/comments/<int:pk>/', views.CommentDetailView.as_view(), name='comment-detail'),
+    path('series/', views.EventSeriesListCreateView.as_view(), name='series-list-create'),
+    path('series/<int:pk>/', views.EventSeriesDetailView.as_view(), name='series-detail'),
+    path('series/<int:series_id>/occurrences/<int:occurrence>/join/', views.join_occurrence,
+         name='join-occurrence'),
+    path('series/<int:series_id>/occurrences/<int:occurrence>/comments/', views.OccurrenceCommentCreateView.as_view(),
+         name='occurrence-comment-create'),
+    path('calendar/', views.calendar_subscription, name='calendar-subscription'),
+    path('calendar/<slug:token>.ics', views.calendar_feed, name='calendar-feed'),
+    path('calendar/category/<slug:category>.ics', views.category_calendar_feed, name='category-calendar-feed'),
+    path('import/', views.import_events_view, name='import-events'),
+    path('export/', views.export_data, name='export-data'),
     path('search-locations/', views.search_locations, name='search-locations'),
 ]
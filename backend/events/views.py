@@ -1,19 +1,44 @@
 from rest_framework import generics, status
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.decorators import api_view, authentication_classes, permission_classes, throttle_classes
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.exceptions import NotFound, PermissionDenied
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
-from django.db.models import Q
-from django.utils import timezone
+import codecs
+import gzip
+import logging
+import operator
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from functools import reduce
 from django.conf import settings
-import googlemaps
-from .models import Event, Comment
-from .serializers import EventSerializer, EventListSerializer, CommentSerializer, EventJoinSerializer
+from django.db import transaction
+from django.db.models import F, Q
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.decorators import method_decorator
+from notifications.fanout import publish
+from notifications.models import Activity
+from accounts import avatars
+from meetup_clone.idempotency import idempotent
+from meetup_clone.throttling import CommentThrottle, JoinThrottle, LocationSearchThrottle, UserThrottle
+from . import calendar, documents, geocoding, recurrence, waitlist
+from .models import CalendarSubscription, Event, EventSeries, Comment, new_calendar_token
+from .serializers import (
+    EventSerializer, EventListSerializer, EventSeriesSerializer, CommentSerializer, EventJoinSerializer,
+)
+from .importer import IMPORT_FORMATS, guess_format, import_events
+from .export import EXPORT_DATASETS, EXPORT_FORMATS, content_type_for, filename_for, iter_encoded, iter_rows, watermark
+
+logger = logging.getLogger(__name__)
 
 
 class EventListCreateView(generics.ListCreateAPIView):
-    queryset = Event.objects.filter(is_cancelled=False)
+    queryset = Event.objects.filter(is_cancelled=False).with_attendee_count()
     permission_classes = []  # Allow public access to list events
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['category', 'host']
@@ -26,6 +51,10 @@ class EventListCreateView(generics.ListCreateAPIView):
             return EventSerializer
         return EventListSerializer
 
+    @method_decorator(idempotent)
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
     def get_queryset(self):
         queryset = super().get_queryset()
         
@@ -44,6 +73,42 @@ class EventListCreateView(generics.ListCreateAPIView):
         
         return queryset
 
+    def get_series(self, start, end):
+        """Active series with occurrences in the window, filtered like the events."""
+        series = EventSeries.objects.filter(is_cancelled=False, start__lte=end).exclude(until__lt=start)
+        for field in self.filterset_fields:
+            value = self.request.query_params.get(field)
+            if value:
+                series = series.filter(**{field: value})
+        for term in SearchFilter().get_search_terms(self.request):
+            series = series.filter(
+                reduce(operator.or_, (Q(**{f'{field}__icontains': term}) for field in self.search_fields))
+            )
+        return list(series)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        ordering = tuple(queryset.query.order_by)
+        if ordering not in (('date_time',), ('-date_time',)):
+            # Occurrences can only be merged into a date-ordered feed
+            return super().list(request, *args, **kwargs)
+
+        start = timezone.now()
+        start_date = _parse_bound(request.query_params.get('start_date'))
+        if start_date and start_date > start:
+            start = start_date
+        end = _parse_bound(request.query_params.get('end_date'))
+        if end is None:
+            end = timezone.now() + timedelta(days=settings.SERIES_FEED_HORIZON_DAYS)
+
+        feed = recurrence.MergedFeed(
+            queryset, self.get_series(start, end), start, end, reverse=ordering[0].startswith('-'),
+        )
+        page = self.paginate_queryset(feed)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(feed[:None], many=True).data)
+
     def get_permissions(self):
         """
         Instantiates and returns the list of permissions that this view requires.
@@ -56,66 +121,168 @@ class EventListCreateView(generics.ListCreateAPIView):
         return [permission() for permission in permission_classes]
 
 
+def _parse_bound(value):
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        date = parse_date(value)
+        if date is None:
+            return None
+        parsed = datetime.combine(date, time.min)
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
 class EventDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Event.objects.all()
     serializer_class = EventSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Event.objects.filter(is_cancelled=False)
+        return Event.objects.filter(is_cancelled=False).with_attendee_count()
+
+    def retrieve(self, request, *args, **kwargs):
+        # Served from the precomputed document without touching the serializer
+        body = documents.get(kwargs['pk']) or documents.build(kwargs['pk'])
+        if body is None:
+            raise NotFound()
+        return HttpResponse(avatars.absolutize_json(body, request), content_type='application/json')
+
+    def perform_update(self, serializer):
+        instance = serializer.instance
+        changed = sorted(
+            field for field, value in serializer.validated_data.items() if getattr(instance, field) != value
+        )
+        with transaction.atomic():
+            event = serializer.save()
+            if changed:
+                # Attendees are notified in the background, however many there are
+                publish(Activity.KIND_EVENT_UPDATED, event.id, self.request.user, title=event.title, fields=changed)
 
     def perform_destroy(self, instance):
         # Soft delete by marking as cancelled
-        instance.is_cancelled = True
-        instance.save()
+        with transaction.atomic():
+            instance.is_cancelled = True
+            instance.save()
+            publish(Activity.KIND_EVENT_CANCELLED, instance.id, self.request.user, title=instance.title)
 
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@throttle_classes([UserThrottle, JoinThrottle])
+@idempotent
 def join_event(request, event_id):
-    try:
-        event = Event.objects.get(id=event_id, is_cancelled=False)
-    except Event.DoesNotExist:
-        return Response({'error': 'Event not found'}, status=status.HTTP_404_NOT_FOUND)
+    with transaction.atomic():
+        try:
+            event = waitlist.lock(event_id, is_cancelled=False)
+        except Event.DoesNotExist:
+            return Response({'error': 'Event not found'}, status=status.HTTP_404_NOT_FOUND)
 
+        return _join(request, event)
+
+
+def _join(request, event):
+    """
+    Join `event`, locked by the caller, or queue up on its waitlist if it is
+    full. Anyone already waiting goes first, even if a seat is free.
+    """
     serializer = EventJoinSerializer(data={}, context={'event': event, 'request': request})
     serializer.is_valid(raise_exception=True)
 
+    if event.is_full or event.waitlist_length:
+        waitlist.add(event, request.user)
+        # Seats freed outside leave_event (admin edits) go to the queue in order
+        if request.user.id in waitlist.promote(event):
+            return Response({'message': 'Successfully joined event'}, status=status.HTTP_200_OK)
+        return Response(
+            {'message': 'Event is full, added to the waitlist',
+             'waitlist_position': waitlist.place(event, request.user)},
+            status=status.HTTP_202_ACCEPTED,
+        )
     event.attendees.add(request.user)
     return Response({'message': 'Successfully joined event'}, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@throttle_classes([UserThrottle, JoinThrottle])
+@idempotent
 def leave_event(request, event_id):
-    try:
-        event = Event.objects.get(id=event_id, is_cancelled=False)
-    except Event.DoesNotExist:
-        return Response({'error': 'Event not found'}, status=status.HTTP_404_NOT_FOUND)
+    with transaction.atomic():
+        try:
+            event = waitlist.lock(event_id, is_cancelled=False)
+        except Event.DoesNotExist:
+            return Response({'error': 'Event not found'}, status=status.HTTP_404_NOT_FOUND)
 
-    if not event.attendees.filter(id=request.user.id).exists():
-        return Response({'error': 'Not attending this event'}, status=status.HTTP_400_BAD_REQUEST)
+        if not event.attendees.filter(id=request.user.id).exists():
+            return Response({'error': 'Not attending this event'}, status=status.HTTP_400_BAD_REQUEST)
 
-    event.attendees.remove(request.user)
+        event.attendees.remove(request.user)
+        # Hand the freed seat to the next user in line before releasing the lock
+        waitlist.promote(event)
     return Response({'message': 'Successfully left event'}, status=status.HTTP_200_OK)
 
 
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def event_waitlist(request, event_id):
+    """
+    GET reports the user's place on the waitlist (null when not waiting) so
+    clients don't have to poll join; DELETE leaves the waitlist.
+    """
+    if request.method == 'DELETE':
+        with transaction.atomic():
+            try:
+                event = waitlist.lock(event_id)
+            except Event.DoesNotExist:
+                return Response({'error': 'Event not found'}, status=status.HTTP_404_NOT_FOUND)
+            if not waitlist.remove(event, request.user):
+                return Response({'error': 'Not on the waitlist'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'message': 'Left the waitlist'}, status=status.HTTP_200_OK)
+
+    event = Event.objects.filter(id=event_id).only('id', 'waitlist_head', 'waitlist_tail').first()
+    if event is None:
+        return Response({'error': 'Event not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response({'position': waitlist.place(event, request.user), 'length': event.waitlist_length})
+
+
 class CommentListCreateView(generics.ListCreateAPIView):
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticated]
+    throttle_classes = [UserThrottle, CommentThrottle]
+
+    def get_event_id(self):
+        return self.kwargs['event_id']
 
     def get_queryset(self):
-        event_id = self.kwargs['event_id']
-        return Comment.objects.filter(event_id=event_id)
+        event_id = self.get_event_id()
+        return Comment.objects.filter(event_id=event_id).select_related('user')
+
+    @method_decorator(idempotent)
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
+    def get_pagination_count(self):
+        # comment_count is kept exact on every create/delete path, so skip the COUNT(*)
+        count = Event.objects.filter(id=self.get_event_id()).values_list('comment_count', flat=True).first()
+        return count or 0
 
     def perform_create(self, serializer):
-        event_id = self.kwargs['event_id']
-        try:
-            event = Event.objects.get(id=event_id, is_cancelled=False)
-        except Event.DoesNotExist:
-            raise serializers.ValidationError("Event not found")
-        
-        serializer.save(event=event)
+        with transaction.atomic():
+            event_id = self.get_event_id()
+            # Bumping the counters doubles as the existence check and locks the event row
+            updated = Event.objects.filter(id=event_id, is_cancelled=False).update(
+                comment_count=F('comment_count') + 1,
+                last_comment_at=timezone.now(),
+            )
+            if not updated:
+                raise NotFound("Event not found")
+            comment = serializer.save(event_id=event_id)
+            documents.refresh(event_id)
+            publish(
+                Activity.KIND_COMMENT_ADDED, event_id, self.request.user,
+                comment_id=comment.id, excerpt=comment.text[:100],
+            )
 
 
 class CommentDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -124,17 +291,109 @@ class CommentDetailView(generics.RetrieveUpdateDestroyAPIView):
 
     def get_queryset(self):
         event_id = self.kwargs['event_id']
-        return Comment.objects.filter(event_id=event_id)
+        return (
+            Comment.objects.filter(event_id=event_id)
+            .select_related('user')
+            .annotate(event_host_id=F('event__host_id'))
+        )
+
+    def perform_update(self, serializer):
+        # Only the comment author may edit it
+        if serializer.instance.user_id != self.request.user.id:
+            raise PermissionDenied("Not authorized to edit this comment")
+        serializer.save()
 
     def perform_destroy(self, instance):
         # Only allow the comment author or event host to delete
-        if instance.user != self.request.user and instance.event.host != self.request.user:
-            raise PermissionError("Not authorized to delete this comment")
+        if self.request.user.id not in (instance.user_id, instance.event_host_id):
+            raise PermissionDenied("Not authorized to delete this comment")
+        # The post_delete signal recounts the event's comments
         instance.delete()
 
 
+class EventSeriesListCreateView(generics.ListCreateAPIView):
+    queryset = EventSeries.objects.filter(is_cancelled=False)
+    serializer_class = EventSeriesSerializer
+    filter_backends = [DjangoFilterBackend, SearchFilter]
+    filterset_fields = ['category', 'host', 'frequency']
+    search_fields = ['title', 'description', 'location']
+
+    def get_permissions(self):
+        if self.request.method == 'GET':
+            return []
+        return [IsAuthenticated()]
+
+
+class EventSeriesDetailView(generics.RetrieveUpdateDestroyAPIView):
+    queryset = EventSeries.objects.filter(is_cancelled=False)
+    serializer_class = EventSeriesSerializer
+    permission_classes = [IsAuthenticated]
+
+    def perform_update(self, serializer):
+        if serializer.instance.host_id != self.request.user.id:
+            raise PermissionDenied("Not authorized to edit this series")
+        series = serializer.save()
+        # Keep already materialized upcoming occurrences in line with the series
+        upcoming = series.occurrences.filter(date_time__gte=timezone.now())
+        event_ids = list(upcoming.values_list('id', flat=True))
+        upcoming.update(updated_at=timezone.now(), **series.occurrence_fields())
+        documents.refresh(*event_ids)
+
+    def perform_destroy(self, instance):
+        if instance.host_id != self.request.user.id:
+            raise PermissionDenied("Not authorized to cancel this series")
+        with transaction.atomic():
+            instance.is_cancelled = True
+            instance.save()
+            upcoming = instance.occurrences.filter(date_time__gte=timezone.now())
+            documents.invalidate(*upcoming.values_list('id', flat=True))
+            upcoming.update(is_cancelled=True, updated_at=timezone.now())
+
+
+def get_occurrence(series_id, occurrence):
+    """Materialize the occurrence of a series starting at the `occurrence` timestamp."""
+    series = EventSeries.objects.filter(id=series_id, is_cancelled=False).first()
+    try:
+        when = datetime.fromtimestamp(occurrence, tz=dt_timezone.utc)
+    except (OverflowError, OSError, ValueError):
+        when = None
+    if series is None or when is None or not recurrence.Recurrence(series).is_occurrence(when):
+        raise NotFound("Occurrence not found")
+    return recurrence.materialize(series, when)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@throttle_classes([UserThrottle, JoinThrottle])
+@idempotent
+def join_occurrence(request, series_id, occurrence):
+    # Materialize in the join's transaction: a rejected join raises and rolls
+    # the new row back with it
+    with transaction.atomic():
+        event = get_occurrence(series_id, occurrence)
+        try:
+            event = waitlist.lock(event.id, is_cancelled=False)
+        except Event.DoesNotExist:
+            return Response({'error': 'Event not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        response = _join(request, event)
+    response.data['event_id'] = event.id
+    return response
+
+
+class OccurrenceCommentCreateView(CommentListCreateView):
+    """Comment on a series occurrence, materializing it first."""
+    http_method_names = ['post', 'options']
+
+    def get_event_id(self):
+        if not hasattr(self, '_event_id'):
+            self._event_id = get_occurrence(self.kwargs['series_id'], self.kwargs['occurrence']).id
+        return self._event_id
+
+
 @api_view(['GET'])
 @permission_classes([])  # Allow public access
+@throttle_classes([UserThrottle, LocationSearchThrottle])
 def search_locations(request):
     """
     Search for locations using Google Places API
@@ -145,36 +404,148 @@ def search_locations(request):
         return Response({'results': []})
     
     # Check if API key is loaded
-    api_key = settings.GOOGLE_MAPS_API_KEY
-    if not api_key:
-        print("ERROR: GOOGLE_MAPS_API_KEY is not set!")
+    if not geocoding.is_configured():
+        logger.error('GOOGLE_MAPS_API_KEY is not set')
         return Response({'error': 'API key not configured'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
     try:
-        print(f"Searching for: {query}")
-        print(f"API Key: {api_key[:10]}...")
-        
-        # Initialize Google Maps client
-        gmaps = googlemaps.Client(key=api_key)
-        
-        # Search for places
-        places_result = gmaps.places(query)
-        print(f"Places result: {places_result}")
-        
-        results = []
-        for place in places_result.get('results', [])[:5]:  # Limit to 5 results
-            result = {
-                'name': place.get('name', ''),
-                'address': place.get('formatted_address', ''),
-                'lat': place['geometry']['location']['lat'],
-                'lng': place['geometry']['location']['lng'],
-                'place_id': place.get('place_id', '')
-            }
-            results.append(result)
-        
-        print(f"Returning {len(results)} results")
+        # Results are cached per query, so typing bursts only hit Places once
+        results = geocoding.search_places(query)
         return Response({'results': results})
         
-    except Exception as e:
-        print(f"Error searching locations: {e}")
+    except Exception:
+        logger.exception('Location search failed for %r', query)
         return Response({'results': []}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def export_data(request):
+    """
+    Stream a bulk export of events, attendees or comments as CSV or NDJSON.
+    Query params: dataset, output (csv|ndjson), gzip (1), since (ISO timestamp).
+    The X-Export-Watermark header carries the `since` value for the next run;
+    it trails now by EXPORT_SAFETY_LAG (see export.watermark).
+    """
+    dataset = request.query_params.get('dataset', 'events')
+    file_format = request.query_params.get('output', 'csv')
+    compress = request.query_params.get('gzip') in ('1', 'true')
+
+    if dataset not in EXPORT_DATASETS:
+        return Response({'error': f'Unknown dataset: {dataset}'}, status=status.HTTP_400_BAD_REQUEST)
+    if file_format not in EXPORT_FORMATS:
+        return Response({'error': f'Unknown output format: {file_format}'}, status=status.HTTP_400_BAD_REQUEST)
+
+    since = request.query_params.get('since')
+    if since:
+        try:
+            since = parse_datetime(since)
+        except ValueError:
+            # Well formed but out of range, e.g. month 13
+            since = None
+        if since is None:
+            return Response({'error': 'Invalid since timestamp'}, status=status.HTTP_400_BAD_REQUEST)
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+
+    until = watermark()
+    response = StreamingHttpResponse(
+        iter_encoded(iter_rows(dataset, file_format, since, until), compress=compress),
+        content_type='application/gzip' if compress else content_type_for(file_format),
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename_for(dataset, file_format, compress)}"'
+    response['X-Export-Watermark'] = until.isoformat()
+    return response
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def import_events_view(request):
+    """
+    Bulk import events from an uploaded CSV or NDJSON `file`, hosted by the
+    requesting user. Returns per-chunk throughput and the first row errors.
+    """
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({'error': 'No file uploaded'}, status=status.HTTP_400_BAD_REQUEST)
+
+    file_format = request.data.get('file_format') or guess_format(upload.name)
+    if file_format not in IMPORT_FORMATS:
+        return Response({'error': f'Unknown file format: {file_format}'}, status=status.HTTP_400_BAD_REQUEST)
+
+    if upload.name.lower().endswith('.gz'):
+        lines = gzip.open(upload, 'rt', encoding='utf-8', newline='')
+    else:
+        lines = codecs.iterdecode(upload, 'utf-8')
+    try:
+        summary = import_events(
+            lines,
+            file_format,
+            request.user,
+            geocode=request.data.get('geocode', 'true') not in ('0', 'false'),
+        )
+    except (UnicodeDecodeError, OSError, EOFError) as e:
+        # Chunks before the bad line are already committed
+        return Response({'error': f'Could not read the file: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(summary, status=status.HTTP_201_CREATED if summary['created'] else status.HTTP_200_OK)
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticated])
+def calendar_subscription(request):
+    """
+    GET returns the URL of the user's private iCalendar feed of events they
+    attend, creating it on first use. POST replaces the token, which revokes
+    the old URL.
+    """
+    subscription, _ = CalendarSubscription.objects.get_or_create(user=request.user)
+    if request.method == 'POST':
+        subscription.token = new_calendar_token()
+        subscription.save(update_fields=['token'])
+    url = request.build_absolute_uri(reverse('calendar-feed', args=[subscription.token]))
+    return Response({'token': subscription.token, 'url': url})
+
+
+def _calendar_response(request, events, name, etag, last_modified, cache_control):
+    """Answer 304 when the client's copy is current, otherwise stream the feed."""
+    last_modified = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = StreamingHttpResponse(
+            iter_encoded(calendar.iter_calendar(events, name)), content_type='text/calendar; charset=utf-8',
+        )
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = cache_control
+    return response
+
+
+@api_view(['GET'])
+@authentication_classes([])  # The token in the URL is the credential
+@permission_classes([])
+def calendar_feed(request, token):
+    state = calendar.subscription_state(token)
+    if state is None:
+        raise Http404
+    etag = calendar.fingerprint(
+        state['user_id'], state['event_count'], state['last_modified'], state['attendance_changed_at'],
+    )
+    last_modified = max(filter(None, (state['last_modified'], state['attendance_changed_at'])))
+    return _calendar_response(
+        request, calendar.user_events(state['user_id']), 'My events', etag, last_modified, 'private, max-age=300',
+    )
+
+
+@api_view(['GET'])
+@permission_classes([])  # Allow public access
+def category_calendar_feed(request, category):
+    labels = dict(Event.CATEGORY_CHOICES)
+    if category not in labels:
+        raise Http404
+    state = calendar.category_state(category)
+    etag = calendar.fingerprint(category, state['event_count'], state['last_modified'])
+    return _calendar_response(
+        request, calendar.category_events(category), f'{labels[category]} events', etag,
+        state['last_modified'], 'public, max-age=300',
+    )
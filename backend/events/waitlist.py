@@ -0,0 +1,85 @@
+"""
+Per-event waitlist for full events.
+
+Positions are dense and handed out from Event.waitlist_tail; promotions
+advance Event.waitlist_head instead of renumbering the queue, so a user's
+place in line is always `position - waitlist_head`, read from two rows.
+
+Every function here expects to run inside a transaction holding the event's
+row lock (see `lock`), which serializes joins, leaves and promotions for that
+event. Entries must only be deleted through `remove` (the admin and the user
+delete signal both do), otherwise the queue keeps a hole and the tail count
+drifts.
+"""
+from django.db.models import F
+
+from . import documents
+from .models import Event, WaitlistEntry
+
+
+def lock(event_id, **filters):
+    """Fetch and row-lock an event for the rest of the transaction."""
+    return Event.objects.select_for_update().get(id=event_id, **filters)
+
+
+def add(event, user):
+    """Append `user` to the waitlist and return their place in line (1-based)."""
+    position = event.waitlist_tail + 1
+    WaitlistEntry.objects.create(event=event, user=user, position=position)
+    Event.objects.filter(id=event.id).update(waitlist_tail=position)
+    event.waitlist_tail = position
+    documents.refresh(event.id)
+    return position - event.waitlist_head
+
+
+def remove(event, user):
+    """Take `user` off the waitlist, closing the gap behind them. Returns False if absent."""
+    entry = WaitlistEntry.objects.filter(event=event, user=user).first()
+    if entry is None:
+        return False
+    entry.delete()
+    # Shift through negative positions so the unique (event, position)
+    # constraint holds after every row, whatever order the database updates in
+    later = WaitlistEntry.objects.filter(event=event, position__gt=entry.position)
+    later.update(position=-F('position'))
+    WaitlistEntry.objects.filter(event=event, position__lt=0).update(position=-F('position') - 1)
+    Event.objects.filter(id=event.id).update(waitlist_tail=F('waitlist_tail') - 1)
+    event.waitlist_tail -= 1
+    documents.refresh(event.id)
+    return True
+
+
+def promote(event):
+    """Move as many waiting users into the event as there are free seats. Returns their ids."""
+    waiting = event.waitlist_length
+    if not waiting or event.is_cancelled:
+        return []
+    free = waiting
+    if event.max_attendees:
+        free = min(waiting, max(event.max_attendees - event.attendees.count(), 0))
+    if not free:
+        return []
+
+    # Take the next entries in order rather than a position range, so a hole
+    # left by a stray delete can't stall the queue
+    entries = list(
+        WaitlistEntry.objects.filter(event=event, position__gt=event.waitlist_head)
+        .order_by('position').values_list('id', 'user_id', 'position')[:free]
+    )
+    if not entries:
+        return []
+    user_ids = [user_id for _, user_id, _ in entries]
+    head = entries[-1][2]
+    event.attendees.add(*user_ids)
+    WaitlistEntry.objects.filter(id__in=[entry_id for entry_id, _, _ in entries]).delete()
+    Event.objects.filter(id=event.id).update(waitlist_head=head)
+    event.waitlist_head = head
+    return user_ids
+
+
+def place(event, user):
+    """The user's 1-based place in line, or None if they aren't waiting."""
+    position = WaitlistEntry.objects.filter(event=event, user=user).values_list('position', flat=True).first()
+    if position is None:
+        return None
+    return position - event.waitlist_head
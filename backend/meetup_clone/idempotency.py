@@ -0,0 +1,107 @@
+"""
+Idempotency-Key support for write endpoints.
+
+Clients send a unique Idempotency-Key header with a write and reuse it when
+they retry. The first response is kept in the cache for IDEMPOTENCY_TTL
+seconds and replayed to duplicates with an Idempotent-Replayed header. A
+duplicate that arrives while the first request is still running waits for
+its response instead of executing again.
+
+Keys are scoped to the user and the request path, and reusing a key with a
+different body is rejected. Exceptions and server errors are not stored, so
+those retries run again. Waiting on an in-flight request only works across
+workers when the cache is shared (REDIS_URL).
+"""
+import functools
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+HEADER = 'HTTP_IDEMPOTENCY_KEY'
+MAX_KEY_LENGTH = 255
+POLL_INTERVAL = 0.05
+PENDING = 'pending'
+DONE = 'done'
+
+
+def cache_key(request, key):
+    digest = hashlib.sha256(f'{request.method}:{request.path}:{key}'.encode()).hexdigest()
+    return f'idempotency:{request.user.pk}:{digest}'
+
+
+def fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def replay(stored):
+    headers = dict(stored['headers'], **{'Idempotent-Replayed': 'true'})
+    return Response(stored['data'], status=stored['status'], headers=headers)
+
+
+def idempotent(view):
+    """
+    Decorate a view function (or, through method_decorator, a view method)
+    that returns DRF Responses. Requests without the header, or from
+    anonymous users, pass straight through.
+    """
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key = request.META.get(HEADER)
+        if key is None or not request.user.is_authenticated:
+            return view(request, *args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {'error': f'Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        key = cache_key(request, key)
+        request_fingerprint = fingerprint(request)
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+        # add() is atomic, so exactly one request claims the key
+        while not cache.add(key, {'state': PENDING, 'fingerprint': request_fingerprint},
+                            settings.IDEMPOTENCY_LOCK_TIMEOUT):
+            stored = cache.get(key)
+            if stored is None:
+                # The first request failed and released the key; claim it
+                continue
+            if stored['fingerprint'] != request_fingerprint:
+                return Response(
+                    {'error': 'Idempotency-Key was already used for a different request'},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                )
+            if stored['state'] == DONE:
+                return replay(stored)
+            if time.monotonic() >= deadline:
+                return Response(
+                    {'error': 'A request with this Idempotency-Key is still in progress'},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            time.sleep(POLL_INTERVAL)
+
+        try:
+            response = view(request, *args, **kwargs)
+        except Exception:
+            cache.delete(key)
+            raise
+        if response.status_code >= 500 or not isinstance(response, Response):
+            cache.delete(key)
+            return response
+
+        cache.set(key, {
+            'state': DONE,
+            'fingerprint': request_fingerprint,
+            'status': response.status_code,
+            'data': response.data,
+            # Headers set by the view (e.g. Location); the rest come from rendering
+            'headers': dict(response.items()),
+        }, settings.IDEMPOTENCY_TTL)
+        return response
+
+    return wrapper
@@ -0,0 +1,87 @@
+import random
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from . import traffic
+
+re_accepts_br = _lazy_re_compile(r'\bbr\b')
+
+
+def carries_credentials(request):
+    """Whether the response may reflect a secret: authenticated, or addressed by a URL token."""
+    if 'HTTP_AUTHORIZATION' in request.META or settings.SESSION_COOKIE_NAME in request.COOKIES:
+        return True
+    match = request.resolver_match
+    return match is not None and 'token' in match.kwargs
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Negotiated response compression: Brotli when the client accepts it and the
+    `brotli` package is installed, gzip otherwise. Responses smaller than
+    COMPRESSION_MIN_SIZE bytes are sent as is. Streaming responses are left
+    alone; the bulk export compresses its own stream.
+
+    Django pads gzip output with random bytes against BREACH-style attacks.
+    Brotli has no such padding, so responses to requests carrying
+    credentials always use gzip.
+    """
+
+    def process_response(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if len(response.content) < getattr(settings, 'COMPRESSION_MIN_SIZE', 1024):
+            return response
+
+        accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if brotli is None or not re_accepts_br.search(accept_encoding) or carries_credentials(request):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        compressed = brotli.compress(response.content, quality=getattr(settings, 'BROTLI_QUALITY', 4))
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
+
+
+class TrafficCaptureMiddleware:
+    """
+    Records a TRAFFIC_CAPTURE_RATE fraction of API requests to
+    TRAFFIC_CAPTURE_PATH for replay; see meetup_clone/traffic.py. Removed from
+    the stack entirely when the rate is 0.
+    """
+
+    def __init__(self, get_response):
+        self.rate = getattr(settings, 'TRAFFIC_CAPTURE_RATE', 0)
+        if not self.rate:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.log = traffic.TrafficLog(settings.TRAFFIC_CAPTURE_PATH)
+
+    def __call__(self, request):
+        if not request.path.startswith('/api/') or random.random() >= self.rate:
+            return self.get_response(request)
+
+        # Read the body before the view consumes the stream
+        body = traffic.body_shape(request)
+        started = time.time()
+        timer = time.perf_counter()
+        response = self.get_response(request)
+        self.log.write(traffic.build_record(request, response, started, time.perf_counter() - timer, body))
+        return response
@@ -0,0 +1,133 @@
+import json
+
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+
+# Below this many (estimated) rows an exact COUNT(*) is cheap enough to run
+EXACT_COUNT_THRESHOLD = 10000
+
+
+def estimate_count(queryset):
+    """
+    Ask PostgreSQL's planner how many rows `queryset` has instead of counting
+    them: pg_class.reltuples for an unfiltered table, EXPLAIN's row estimate
+    otherwise. Returns None when no estimate is available (other databases,
+    never-analyzed tables).
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+            estimate = row[0] if row else None
+        else:
+            sql, params = queryset.order_by().values('pk').query.sql_with_params()
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            estimate = plan[0]['Plan']['Plan Rows']
+
+    if estimate is None or estimate < 0:
+        return None
+    return int(estimate)
+
+
+class EstimatedPage(Page):
+    """Page whose has_next() comes from fetching one extra row, not from the count."""
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that trusts the planner's row estimate for large result sets
+    and only runs an exact COUNT(*) when the estimate is small. A
+    `count_hint` callable returning an exact, already maintained count
+    (e.g. a denormalized counter) takes precedence over both.
+    """
+    count_hint = None
+    count_is_estimate = False
+
+    @cached_property
+    def count(self):
+        if self.count_hint is not None:
+            return self.count_hint()
+        estimate = estimate_count(self.object_list) if hasattr(self.object_list, 'query') else None
+        if estimate is None or estimate < EXACT_COUNT_THRESHOLD:
+            return super().count
+        self.count_is_estimate = True
+        return estimate
+
+    def validate_number(self, number):
+        self.count  # Decides count_is_estimate
+        if not self.count_is_estimate:
+            return super().validate_number(number)
+        # An estimate can be low, so there is no last page to check against;
+        # page() rejects pages that turn out to be empty instead
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(_('That page number is not an integer'))
+        if number < 1:
+            raise EmptyPage(_('That page number is less than 1'))
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.count_is_estimate:
+            return super().page(number)
+        # The estimate can't tell whether another page exists, so peek one row ahead
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(_('That page contains no results'))
+        return EstimatedPage(rows[:self.per_page], number, self, has_next=len(rows) > self.per_page)
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    """
+    Default API pagination. Same response as PageNumberPagination plus a
+    `count_is_estimate` flag. Views can define `get_pagination_count()` to
+    supply an exact count they already maintain.
+    """
+
+    def django_paginator_class(self, object_list, per_page):
+        paginator = EstimatedCountPaginator(object_list, per_page)
+        paginator.count_hint = self.count_hint
+        return paginator
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count_hint = getattr(view, 'get_pagination_count', None)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.page.paginator.count,
+            'count_is_estimate': self.page.paginator.count_is_estimate,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_is_estimate'] = {'type': 'boolean', 'example': False}
+        return response_schema
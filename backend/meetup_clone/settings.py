@@ -4,6 +4,7 @@ Django settings for meetup_clone project.
 
 import os
 from pathlib import Path
+from corsheaders.defaults import default_headers
 from decouple import config
 from datetime import timedelta
 
@@ -28,36 +29,57 @@ DJANGO_APPS = [
     'django.contrib.staticfiles',
 ]
 
+# Google OAuth Credentials
+GOOGLE_OAUTH2_CLIENT_ID = config('GOOGLE_OAUTH2_CLIENT_ID', default='')
+GOOGLE_OAUTH2_CLIENT_SECRET = config('GOOGLE_OAUTH2_CLIENT_SECRET', default='')
+
+# The allauth stack (account, socialaccount, google provider) is only loaded
+# when social login is configured, so workers and management commands don't
+# import it otherwise.
+SOCIAL_AUTH_ENABLED = config('SOCIAL_AUTH_ENABLED', default=bool(GOOGLE_OAUTH2_CLIENT_ID), cast=bool)
+
 THIRD_PARTY_APPS = [
     'rest_framework',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
-    'allauth',
-    'allauth.account',
-    'allauth.socialaccount',
-    'allauth.socialaccount.providers.google',
     'django_filters',
 ]
 
+if SOCIAL_AUTH_ENABLED:
+    THIRD_PARTY_APPS += [
+        'allauth',
+        'allauth.account',
+        'allauth.socialaccount',
+        'allauth.socialaccount.providers.google',
+    ]
+
 LOCAL_APPS = [
     'accounts',
     'events',
+    'taskqueue',
+    'notifications',
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    'meetup_clone.middleware.TrafficCaptureMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'meetup_clone.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'allauth.account.middleware.AccountMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+if SOCIAL_AUTH_ENABLED:
+    MIDDLEWARE.insert(MIDDLEWARE.index('django.contrib.auth.middleware.AuthenticationMiddleware') + 1,
+                      'allauth.account.middleware.AccountMiddleware')
+
 ROOT_URLCONF = 'meetup_clone.urls'
 
 TEMPLATES = [
@@ -98,6 +120,15 @@ DATABASES = {
     }
 }
 
+# SQLite needs nothing but a file, for running tests and the task worker locally
+if config('DB_ENGINE', default='postgresql') == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
+    }
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -114,6 +145,33 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing
+# PASSWORD_HASH_POLICY selects the preferred hasher (argon2, scrypt or pbkdf2).
+# The others stay listed so existing hashes still verify; Django rehashes them
+# with the preferred hasher and cost on the user's next login.
+# Run `python manage.py bench_login` to measure costs on your hardware.
+PASSWORD_HASH_POLICIES = {
+    'argon2': 'accounts.hashers.Argon2PasswordHasher',
+    'scrypt': 'accounts.hashers.ScryptPasswordHasher',
+    'pbkdf2': 'accounts.hashers.PBKDF2PasswordHasher',
+}
+PASSWORD_HASH_POLICY = config('PASSWORD_HASH_POLICY', default='argon2')
+PASSWORD_HASHERS = [PASSWORD_HASH_POLICIES[PASSWORD_HASH_POLICY]] + [
+    hasher for policy, hasher in PASSWORD_HASH_POLICIES.items() if policy != PASSWORD_HASH_POLICY
+]
+ARGON2_TIME_COST = config('ARGON2_TIME_COST', default=2, cast=int)
+ARGON2_MEMORY_COST = config('ARGON2_MEMORY_COST', default=65536, cast=int)  # KiB
+ARGON2_PARALLELISM = config('ARGON2_PARALLELISM', default=1, cast=int)
+SCRYPT_WORK_FACTOR = config('SCRYPT_WORK_FACTOR', default=2 ** 14, cast=int)
+PBKDF2_ITERATIONS = config('PBKDF2_ITERATIONS', default=600000, cast=int)
+# Hashes run in a per-process pool of this many threads (0 = the CPU count
+# divided by WEB_CONCURRENCY, the number of server processes per host, so the
+# host as a whole runs at most one hash per core); requests wait at most
+# PASSWORD_HASH_QUEUE_TIMEOUT seconds for a slot before getting a 503
+WEB_CONCURRENCY = config('WEB_CONCURRENCY', default=1, cast=int)
+PASSWORD_HASH_WORKERS = config('PASSWORD_HASH_WORKERS', default=0, cast=int)
+PASSWORD_HASH_QUEUE_TIMEOUT = config('PASSWORD_HASH_QUEUE_TIMEOUT', default=5, cast=float)
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -127,6 +185,26 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Idempotency-Key handling (see meetup_clone/idempotency.py), in seconds: how long
+# responses are kept for replay, how long an in-flight request holds its key and
+# how long a duplicate waits for it
+IDEMPOTENCY_TTL = config('IDEMPOTENCY_TTL', default=24 * 60 * 60, cast=int)
+IDEMPOTENCY_LOCK_TIMEOUT = config('IDEMPOTENCY_LOCK_TIMEOUT', default=60, cast=int)
+IDEMPOTENCY_WAIT_TIMEOUT = config('IDEMPOTENCY_WAIT_TIMEOUT', default=10, cast=float)
+
+# Incremental exports stop this many seconds short of now, so writes still in
+# flight when the export runs are picked up by the next one; keep it longer
+# than the longest write transaction
+EXPORT_SAFETY_LAG = config('EXPORT_SAFETY_LAG', default=300, cast=int)
+
+# Traffic capture for load testing: fraction of API requests to record (0 disables)
+TRAFFIC_CAPTURE_RATE = config('TRAFFIC_CAPTURE_RATE', default=0.0, cast=float)
+TRAFFIC_CAPTURE_PATH = config('TRAFFIC_CAPTURE_PATH', default=os.path.join(BASE_DIR, 'traffic.ndjson'))
+
+# Profile picture uploads (see accounts/avatars.py)
+AVATAR_MAX_UPLOAD_SIZE = config('AVATAR_MAX_UPLOAD_SIZE', default=5 * 1024 * 1024, cast=int)
+AVATAR_THUMBNAIL_WORKERS = config('AVATAR_THUMBNAIL_WORKERS', default=0, cast=int)  # 0 = CPU count
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -141,15 +219,65 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_RENDERER_CLASSES': [
+        'meetup_clone.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'meetup_clone.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'meetup_clone.pagination.EstimatedCountPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'meetup_clone.throttling.UserThrottle',
+    ],
+    # Sliding-window limits, see meetup_clone/throttling.py
+    'DEFAULT_THROTTLE_RATES': {
+        'user': config('THROTTLE_USER_RATE', default='2000/hour'),
+        'login': config('THROTTLE_LOGIN_RATE', default='10/min'),
+        'register': config('THROTTLE_REGISTER_RATE', default='5/min'),
+        'location_search': config('THROTTLE_LOCATION_SEARCH_RATE', default='60/min'),
+        'comment': config('THROTTLE_COMMENT_RATE', default='30/min'),
+        'join': config('THROTTLE_JOIN_RATE', default='30/min'),
+    },
+    # Reverse proxies in front of the app. Clients are identified by the
+    # X-Forwarded-For entry this many hops back; with 0 the header is ignored
+    # and REMOTE_ADDR is used, so it can't be spoofed to dodge rate limits
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
 }
 
+# Response compression (see meetup_clone/middleware.py). Brotli is used when
+# the optional `brotli` package is installed and the client accepts it, except
+# for credentialed requests, which get Django's BREACH-padded gzip.
+COMPRESSION_MIN_SIZE = config('COMPRESSION_MIN_SIZE', default=1024, cast=int)
+BROTLI_QUALITY = config('BROTLI_QUALITY', default=4, cast=int)
+
+# Cache
+# Throttle counters and cached lookups must be shared between workers in
+# production; set REDIS_URL (requires the `redis` package). Without it each
+# process falls back to its own local memory cache.
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # JWT Settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
@@ -166,6 +294,8 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_CREDENTIALS = True
 
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
+
 # Google OAuth Settings
 SOCIALACCOUNT_PROVIDERS = {
     'google': {
@@ -183,9 +313,11 @@ SOCIALACCOUNT_PROVIDERS = {
 # Django Allauth Settings
 AUTHENTICATION_BACKENDS = [
     'django.contrib.auth.backends.ModelBackend',
-    'allauth.account.auth_backends.AuthenticationBackend',
 ]
 
+if SOCIAL_AUTH_ENABLED:
+    AUTHENTICATION_BACKENDS.append('allauth.account.auth_backends.AuthenticationBackend')
+
 SITE_ID = 1
 
 ACCOUNT_EMAIL_REQUIRED = True
@@ -193,9 +325,10 @@ ACCOUNT_USERNAME_REQUIRED = False
 ACCOUNT_AUTHENTICATION_METHOD = 'email'
 ACCOUNT_EMAIL_VERIFICATION = 'none'
 
-# Google OAuth Credentials
-GOOGLE_OAUTH2_CLIENT_ID = config('GOOGLE_OAUTH2_CLIENT_ID', default='')
-GOOGLE_OAUTH2_CLIENT_SECRET = config('GOOGLE_OAUTH2_CLIENT_SECRET', default='')
+# Recurring series: how far ahead the event feed generates occurrences when
+# the client doesn't pass an end_date
+SERIES_FEED_HORIZON_DAYS = config('SERIES_FEED_HORIZON_DAYS', default=90, cast=int)
 
 # Google Maps API Key
-GOOGLE_MAPS_API_KEY = config('GOOGLE_MAPS_API_KEY')
+# Optional: without it location search returns an error and geocoding is skipped
+GOOGLE_MAPS_API_KEY = config('GOOGLE_MAPS_API_KEY', default='')
@@ -0,0 +1,86 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from . import throttling
+from .throttling import IPThrottle, SlidingWindowCounter
+
+THROTTLED_REST_FRAMEWORK = {
+    'DEFAULT_THROTTLE_RATES': {'ip': '3/min'},
+    'NUM_PROXIES': 0,
+}
+
+
+class PingView(APIView):
+    authentication_classes = []
+    permission_classes = []
+    throttle_classes = [IPThrottle]
+
+    def get(self, request):
+        return Response({'ok': True})
+
+
+class SlidingWindowCounterTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.counter = SlidingWindowCounter()
+
+    def test_limit_within_window(self):
+        counts = [self.counter.hit('k', 5, 60, now=600 + i)[0] for i in range(6)]
+        self.assertEqual(counts[:5], [1, 2, 3, 4, 5])
+        self.assertGreater(counts[5], 5)
+
+    def test_previous_window_is_weighted_by_overlap(self):
+        cache.set('k:10', 4)
+        # A quarter into the next window, 3/4 of the previous count still applies
+        count, elapsed = self.counter.hit('k', 10, 60, now=675)
+        self.assertEqual(elapsed, 15)
+        self.assertEqual(count, 4 * 0.75 + 1)
+
+    def test_rejected_hits_are_not_kept(self):
+        for _ in range(3):
+            self.counter.hit('k', 3, 60, now=600)
+        for _ in range(5):
+            self.counter.hit('k', 3, 60, now=601)
+        self.assertEqual(cache.get('k:10'), 3)
+        # Once the old window has slid out, the client is allowed straight away
+        self.assertLessEqual(self.counter.hit('k', 3, 60, now=720)[0], 3)
+
+    def test_hits_well_under_the_limit_are_batched(self):
+        with mock.patch.object(throttling.cache, 'incr', wraps=cache.incr) as incr:
+            for i in range(20):
+                self.counter.hit('k', 1000, 60, now=600 + i / 100)
+        # One flush to seed the local state, then one per FLUSH_EVERY hits
+        self.assertLessEqual(incr.call_count, 1 + 20 // throttling.FLUSH_EVERY)
+        self.assertEqual(self.counter.hit('k', 1000, 60, now=601)[0], 21)
+
+
+@override_settings(REST_FRAMEWORK=THROTTLED_REST_FRAMEWORK)
+class SlidingWindowThrottleTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(throttling, 'counter', SlidingWindowCounter())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.factory = APIRequestFactory()
+
+    def get(self, ip='10.0.0.1'):
+        return PingView.as_view()(self.factory.get('/ping/', REMOTE_ADDR=ip))
+
+    def test_over_limit_gets_429_with_retry_after(self):
+        for _ in range(3):
+            self.assertEqual(self.get().status_code, 200)
+        response = self.get()
+        self.assertEqual(response.status_code, 429)
+        retry_after = int(response['Retry-After'])
+        self.assertGreaterEqual(retry_after, 1)
+        self.assertLessEqual(retry_after, 60)
+
+    def test_clients_are_limited_separately(self):
+        for _ in range(4):
+            self.get()
+        self.assertEqual(self.get('10.0.0.2').status_code, 200)
@@ -0,0 +1,180 @@
+"""
+Sliding-window rate limiting for the API.
+
+Counters live in the shared Django cache so limits hold across workers. Each
+process also keeps a local tally per key: while a client is clearly under its
+limit, hits are batched locally and only flushed to the cache every few
+requests, so most requests cost no cache round trip at all.
+"""
+import math
+import threading
+import time
+
+from django.core.cache import cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+# Serve hits locally while the estimate stays below this fraction of the limit
+LOCAL_FRACTION = 0.5
+# ...and flush at least every this many local hits
+FLUSH_EVERY = 10
+MAX_LOCAL_KEYS = 10000
+
+DURATIONS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 60 * 60 * 24}
+
+
+def parse_rate(rate):
+    """'10/min' -> (10, 60). Same format as DRF's DEFAULT_THROTTLE_RATES."""
+    if rate is None:
+        return None, None
+    num, period = rate.split('/')
+    return int(num), DURATIONS[period[0]]
+
+
+class _WindowState:
+    __slots__ = ('window', 'pending', 'current', 'previous')
+
+    def __init__(self, window):
+        self.window = window
+        self.pending = 0
+        self.current = None
+        self.previous = None
+
+
+class SlidingWindowCounter:
+    """
+    Approximate sliding window: the previous fixed window's count is weighted
+    by how much of it still overlaps the sliding window, plus the current
+    window's count.
+    """
+
+    def __init__(self):
+        self._local = {}
+        self._lock = threading.Lock()
+
+    def _shared_incr(self, key, delta, timeout):
+        try:
+            return cache.incr(key, delta)
+        except ValueError:
+            cache.add(key, 0, timeout)
+            return cache.incr(key, delta)
+
+    def _prune(self, window):
+        for key in [key for key, state in self._local.items() if state.window < window]:
+            del self._local[key]
+
+    def hit(self, key, limit, duration, now=None):
+        """
+        Record a hit and return (estimated count, seconds into the window).
+        A hit that takes the count over `limit` is rejected and not kept, so
+        a client hammering the endpoint while limited is not locked out for
+        longer.
+        """
+        now = time.time() if now is None else now
+        window = int(now // duration)
+        elapsed = now - window * duration
+        weight = 1 - elapsed / duration
+
+        with self._lock:
+            state = self._local.get(key)
+            if state is None or state.window != window:
+                if len(self._local) >= MAX_LOCAL_KEYS:
+                    self._prune(window)
+                state = self._local[key] = _WindowState(window)
+            state.pending += 1
+
+            if state.current is not None and state.pending < FLUSH_EVERY:
+                estimate = state.previous * weight + state.current + state.pending
+                if estimate <= limit * LOCAL_FRACTION:
+                    return estimate, elapsed
+
+            pending, state.pending = state.pending, 0
+
+        # Slow path: flush to the shared cache outside the lock
+        timeout = duration * 2
+        current = self._shared_incr(f'{key}:{window}', pending, timeout)
+        previous = state.previous
+        if previous is None:
+            previous = cache.get(f'{key}:{window - 1}', 0)
+        estimate = previous * weight + current
+        if estimate > limit:
+            # Take back this rejected hit; the batched ones before it were allowed
+            current = cache.decr(f'{key}:{window}')
+
+        with self._lock:
+            if state.window == window:
+                state.current = current
+                state.previous = previous
+        return estimate, elapsed
+
+
+counter = SlidingWindowCounter()
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """
+    Base throttle. Subclasses set `scope` (the key into
+    REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']) and may restrict `methods`.
+    """
+    scope = None
+    methods = None
+
+    def __init__(self):
+        rates = api_settings.DEFAULT_THROTTLE_RATES or {}
+        self.num_requests, self.duration = parse_rate(rates.get(self.scope))
+        self.wait_seconds = None
+
+    def get_ident_key(self, request):
+        return f'ip:{self.get_ident(request)}'
+
+    def allow_request(self, request, view):
+        if self.num_requests is None:
+            return True
+        if self.methods and request.method not in self.methods:
+            return True
+
+        key = f'throttle:{self.scope}:{self.get_ident_key(request)}'
+        count, elapsed = counter.hit(key, self.num_requests, self.duration)
+        if count <= self.num_requests:
+            return True
+
+        self.wait_seconds = math.ceil(self.duration - elapsed)
+        return False
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class UserThrottle(SlidingWindowThrottle):
+    """Limits authenticated users by id and anonymous clients by IP."""
+    scope = 'user'
+
+    def get_ident_key(self, request):
+        if request.user and request.user.is_authenticated:
+            return f'user:{request.user.pk}'
+        return super().get_ident_key(request)
+
+
+class IPThrottle(SlidingWindowThrottle):
+    scope = 'ip'
+
+
+class LoginThrottle(IPThrottle):
+    scope = 'login'
+
+
+class RegisterThrottle(IPThrottle):
+    scope = 'register'
+
+
+class LocationSearchThrottle(IPThrottle):
+    scope = 'location_search'
+
+
+class CommentThrottle(UserThrottle):
+    scope = 'comment'
+    methods = ('POST',)
+
+
+class JoinThrottle(UserThrottle):
+    scope = 'join'
@@ -0,0 +1,145 @@
+"""
+Sampled traffic capture for load testing.
+
+TrafficCaptureMiddleware records the shape of a sample of API requests to an
+NDJSON log: method, URL name, path, query parameters, body keys, how the
+client authenticated, response status and server time. Personal data is
+stripped on the way in: free-text values are replaced by same-length
+placeholders, credentials (passwords, tokens, keys) by fixed-length ones so
+not even their length is kept, secrets in URLs are masked, and users and IPs
+are reduced to keyed hashes that only tell clients apart. `manage.py replay_traffic` plays a
+log back against a server.
+
+One record per line, e.g.
+{"t":1760000000.12,"m":"GET","route":"event-list-create","path":"/api/events/",
+ "q":{"page":"2"},"auth":"jwt","client":"3f2a9c1e","status":200,"ms":18.4}
+"""
+import hashlib
+import hmac
+import json
+import threading
+
+from django.conf import settings
+
+# Query parameters and body fields whose values carry no personal data and
+# are needed for a replayed request to behave like the original
+KEEP_FIELDS = {
+    'page', 'page_size', 'cursor', 'ordering', 'category', 'host', 'frequency', 'interval', 'start_date',
+    'end_date', 'date_time', 'start', 'until', 'unread', 'dataset', 'output', 'gzip',
+}
+# URL keyword arguments that are credentials
+SECRET_KWARGS = {'token'}
+# Parameters and fields holding credentials (also password*, *_password,
+# *_token, *_key); they get a fixed-length placeholder
+SECRET_FIELDS = {'token', 'refresh', 'access', 'key', 'secret', 'code', 'credential'}
+SECRET_PLACEHOLDER = 'x' * 8
+MAX_BODY_SIZE = 64 * 1024
+
+
+def is_secret(key):
+    key = str(key).lower()
+    return (
+        key in SECRET_FIELDS
+        or key.startswith('password')
+        or key.endswith(('_password', '_token', '_key', '_secret'))
+    )
+
+
+def placeholder(value):
+    """Same-length stand-in for free text, so payload sizes survive redaction."""
+    return 'x' * len(value)
+
+
+def redact_field(key, value):
+    if is_secret(key):
+        return SECRET_PLACEHOLDER
+    if key in KEEP_FIELDS:
+        return value
+    return redact_value(value)
+
+
+def redact_query(query_dict):
+    return {key: redact_field(key, value) for key, value in query_dict.items()}
+
+
+def redact_value(value):
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, list):
+        return [redact_value(item) for item in value]
+    if isinstance(value, dict):
+        return {key: redact_field(key, item) for key, item in value.items()}
+    return placeholder(str(value))
+
+
+def body_shape(request):
+    """Redacted copy of a small JSON body; None for anything else (e.g. uploads)."""
+    if not request.content_type == 'application/json':
+        return None
+    if int(request.META.get('CONTENT_LENGTH') or 0) > MAX_BODY_SIZE:
+        return None
+    try:
+        return redact_value(json.loads(request.body or b'null'))
+    except ValueError:
+        return None
+
+
+def client_id(value):
+    digest = hmac.new(settings.SECRET_KEY.encode(), str(value).encode(), hashlib.sha256)
+    return digest.hexdigest()[:8]
+
+
+def masked_path(request):
+    match = request.resolver_match
+    path = request.path
+    if match is not None:
+        for name in SECRET_KWARGS & match.kwargs.keys():
+            path = path.replace(str(match.kwargs[name]), f'{{{name}}}')
+    return path
+
+
+def build_record(request, response, started, elapsed, body):
+    user = getattr(request, 'user', None)
+    authorization = request.META.get('HTTP_AUTHORIZATION', '')
+    if authorization.startswith('Bearer '):
+        auth = 'jwt'
+    elif user is not None and user.is_authenticated:
+        auth = 'session'
+    else:
+        auth = 'anon'
+    if user is not None and user.is_authenticated:
+        client = client_id(f'user:{user.pk}')
+    else:
+        client = client_id(f"ip:{request.META.get('REMOTE_ADDR', '')}")
+
+    match = request.resolver_match
+    record = {
+        't': round(started, 3),
+        'm': request.method,
+        'route': match.view_name if match else None,
+        'path': masked_path(request),
+        'q': redact_query(request.GET),
+        'auth': auth,
+        'client': client,
+        'status': response.status_code,
+        'ms': round(elapsed * 1000, 2),
+    }
+    if body is not None:
+        record['body'] = body
+    return record
+
+
+class TrafficLog:
+    """Appends records to a file; one write per line so processes can share it."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+
+    def write(self, record):
+        line = json.dumps(record, separators=(',', ':')) + '\n'
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'a', buffering=1, encoding='utf-8')
+            self._file.write(line)
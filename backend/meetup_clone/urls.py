@@ -10,8 +10,11 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/auth/', include('accounts.urls')),
     path('api/events/', include('events.urls')),
-    path('api/auth/', include('allauth.urls')),
+    path('api/notifications/', include('notifications.urls')),
 ]
 
+if settings.SOCIAL_AUTH_ENABLED:
+    urlpatterns += [path('api/auth/', include('allauth.urls'))]
+
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
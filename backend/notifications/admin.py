@@ -0,0 +1,33 @@
+from django.contrib import admin
+from meetup_clone.pagination import EstimatedCountPaginator
+from .models import Activity, Inbox, Notification
+
+
+@admin.register(Activity)
+class ActivityAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'event', 'actor', 'fanout_done', 'created_at')
+    list_filter = ('kind', 'fanout_done')
+    list_select_related = ('event', 'actor')
+    search_fields = ('event__title',)
+    ordering = ('-created_at',)
+    readonly_fields = ('created_at', 'fanout_cursor', 'fanout_done')
+    autocomplete_fields = ('event', 'actor')
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('user', 'activity', 'read_at', 'created_at')
+    list_select_related = ('user', 'activity')
+    search_fields = ('=user__email',)
+    ordering = ('-id',)
+    readonly_fields = ('user', 'activity', 'created_at')
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
+
+@admin.register(Inbox)
+class InboxAdmin(admin.ModelAdmin):
+    list_display = ('user', 'unread_count')
+    list_select_related = ('user',)
+    search_fields = ('=user__email',)
+    readonly_fields = ('user',)
@@ -0,0 +1,97 @@
+"""
+Notification fan-out.
+
+`publish` records a single Activity and enqueues its delivery, so the request
+that caused it only pays for two inserts however many people are affected.
+The fan_out task then walks the recipients by id in batches: each batch
+bulk-inserts its notification rows in chunks and bumps the recipients' unread
+counters in one transaction, records how far it got on the Activity, and
+enqueues the next batch.
+"""
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import Activity, Inbox, Notification
+
+BATCH_SIZE = 2000
+INSERT_CHUNK_SIZE = 500
+
+
+def publish(kind, event_id, actor=None, **data):
+    """Record an activity on an event and enqueue its fan-out in the same transaction."""
+    from .tasks import fan_out
+
+    with transaction.atomic():
+        activity = Activity.objects.create(kind=kind, event_id=event_id, actor=actor, data=data)
+        fan_out.enqueue(activity_id=activity.id)
+    return activity
+
+
+def recipient_ids(activity, after, limit):
+    """Next `limit` recipient ids above `after`, in id order."""
+    from events.models import Event
+
+    attendees = Event.attendees.through.objects.filter(event_id=activity.event_id, user_id__gt=after)
+    ids = list(attendees.order_by('user_id').values_list('user_id', flat=True)[:limit])
+    if activity.kind == Activity.KIND_COMMENT_ADDED:
+        # The host hears about comments too; hosts can't attend their own events
+        host_id = Event.objects.filter(id=activity.event_id).values_list('host_id', flat=True).first()
+        if host_id and host_id > after and (len(ids) < limit or host_id < ids[-1]):
+            ids = sorted(ids + [host_id])[:limit]
+    return [user_id for user_id in ids if user_id != activity.actor_id], (ids[-1] if ids else None)
+
+
+def deliver(activity, user_ids):
+    """Insert one notification per user and bump their unread counters."""
+    if not user_ids:
+        return 0
+    Notification.objects.bulk_create(
+        [Notification(user_id=user_id, activity_id=activity.id) for user_id in user_ids],
+        batch_size=INSERT_CHUNK_SIZE,
+    )
+    Inbox.objects.bulk_create(
+        [Inbox(user_id=user_id) for user_id in user_ids],
+        batch_size=INSERT_CHUNK_SIZE,
+        ignore_conflicts=True,
+    )
+    Inbox.objects.filter(user_id__in=user_ids).update(unread_count=F('unread_count') + 1)
+    return len(user_ids)
+
+
+def fan_out_batch(activity_id, batch_size=BATCH_SIZE):
+    """
+    Deliver the next batch of an activity. Returns the number of notifications
+    created, or None once every recipient has been reached.
+    """
+    with transaction.atomic():
+        activity = Activity.objects.select_for_update().filter(id=activity_id, fanout_done=False).first()
+        if activity is None:
+            return None
+        user_ids, last_id = recipient_ids(activity, activity.fanout_cursor, batch_size)
+        if last_id is None:
+            Activity.objects.filter(id=activity_id).update(fanout_done=True)
+            return None
+        delivered = deliver(activity, user_ids)
+        Activity.objects.filter(id=activity_id).update(fanout_cursor=last_id)
+    return delivered
+
+
+def unread_count(user):
+    return Inbox.objects.filter(user=user).values_list('unread_count', flat=True).first() or 0
+
+
+def mark_read(user, ids=None):
+    """Mark the user's notifications (all, or just `ids`) read. Returns how many changed."""
+    with transaction.atomic():
+        unread = Notification.objects.filter(user=user, read_at__isnull=True)
+        if ids is not None:
+            unread = unread.filter(id__in=ids)
+        updated = unread.update(read_at=timezone.now())
+        if updated:
+            if ids is None:
+                Inbox.objects.filter(user=user).update(unread_count=0)
+            else:
+                Inbox.objects.filter(user=user).update(unread_count=Greatest(F('unread_count') - updated, 0))
+    return updated
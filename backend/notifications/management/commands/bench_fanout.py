@@ -0,0 +1,88 @@
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from events.models import Event
+from notifications import fanout
+from notifications.models import Activity, Inbox, Notification
+
+User = get_user_model()
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Measure notification fan-out throughput for one event with many attendees (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--attendees', type=int, default=10000)
+        parser.add_argument('--batch-size', type=int, default=fanout.BATCH_SIZE)
+        parser.add_argument('--naive', type=int, default=1000,
+                            help='Attendees to notify with a per-row loop for comparison (0 to skip)')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, options):
+        stamp = int(time.time())
+        users = User.objects.bulk_create(
+            [
+                User(email=f'bench-{stamp}-{i}@example.com', username=f'bench-{stamp}-{i}', password='!')
+                for i in range(options['attendees'] + 1)
+            ],
+            batch_size=1000,
+        )
+        host, attendees = users[0], users[1:]
+        event = Event.objects.create(
+            title='Fan-out benchmark', description='', category='other', host=host,
+            date_time=timezone.now() + timedelta(days=1),
+        )
+        Event.attendees.through.objects.bulk_create(
+            [Event.attendees.through(event_id=event.id, user_id=user.id) for user in attendees],
+            batch_size=1000,
+        )
+
+        started = time.perf_counter()
+        fanout.publish(Activity.KIND_EVENT_UPDATED, event.id, host, title=event.title, fields=['date_time'])
+        publish_ms = (time.perf_counter() - started) * 1000
+
+        activity = Activity.objects.latest('id')
+        started = time.perf_counter()
+        batches = delivered = 0
+        while True:
+            count = fanout.fan_out_batch(activity.id, options['batch_size'])
+            if count is None:
+                break
+            batches += 1
+            delivered += count
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(f"{len(attendees)} attendees, batch size {options['batch_size']}")
+        self.stdout.write(f'  publish (request path): {publish_ms:.2f} ms')
+        self.stdout.write(
+            f'  batched fan-out:        {delivered} notifications in {batches} batches, '
+            f'{elapsed:.2f} s ({delivered / elapsed:,.0f}/s)'
+        )
+
+        naive = attendees[:options['naive']]
+        if naive:
+            activity = Activity.objects.create(kind=Activity.KIND_EVENT_UPDATED, event=event, actor=host)
+            started = time.perf_counter()
+            for user in naive:
+                Notification.objects.create(user=user, activity=activity)
+                inbox, _ = Inbox.objects.get_or_create(user=user)
+                inbox.unread_count += 1
+                inbox.save()
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f'  per-attendee loop:      {len(naive)} notifications, '
+                              f'{elapsed:.2f} s ({len(naive) / elapsed:,.0f}/s)')
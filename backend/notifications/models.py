@@ -0,0 +1,68 @@
+from django.conf import settings
+from django.db import models
+
+
+class Activity(models.Model):
+    """
+    One change worth telling people about. It is recorded once and fanned out
+    to the recipients' inboxes in the background, see notifications/fanout.py.
+    """
+    KIND_EVENT_UPDATED = 'event_updated'
+    KIND_EVENT_CANCELLED = 'event_cancelled'
+    KIND_COMMENT_ADDED = 'comment_added'
+    KIND_CHOICES = [
+        (KIND_EVENT_UPDATED, 'Event updated'),
+        (KIND_EVENT_CANCELLED, 'Event cancelled'),
+        (KIND_COMMENT_ADDED, 'Comment added'),
+    ]
+
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    event = models.ForeignKey('events.Event', on_delete=models.CASCADE, related_name='activities')
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    data = models.JSONField(default=dict, blank=True)
+    # Last recipient id already delivered; lets a retried batch skip finished work
+    fanout_cursor = models.BigIntegerField(default=0)
+    fanout_done = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name_plural = 'activities'
+
+    def __str__(self):
+        return f"{self.get_kind_display()} - {self.event_id}"
+
+
+class Notification(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notifications')
+    activity = models.ForeignKey(Activity, on_delete=models.CASCADE, related_name='notifications')
+    read_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-id']
+        indexes = [
+            models.Index(fields=['user', '-id']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'activity'], name='unique_notification_per_activity'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.activity}"
+
+
+class Inbox(models.Model):
+    """Per-user unread counter, maintained alongside the notification rows."""
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='inbox'
+    )
+    unread_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = 'inboxes'
+
+    def __str__(self):
+        return f"{self.user_id}: {self.unread_count} unread"
@@ -0,0 +1,12 @@
+from rest_framework.pagination import CursorPagination
+
+
+class InboxPagination(CursorPagination):
+    """
+    Keyset pagination over the user's inbox: each page is an index range scan
+    on (user, -id) from the cursor, however deep the client scrolls.
+    """
+    ordering = '-id'
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
@@ -0,0 +1,34 @@
+from rest_framework import serializers
+from accounts import summaries
+from .models import Notification
+
+
+class NotificationListSerializer(serializers.ListSerializer):
+    """Resolves every actor's summary in one batch before rendering."""
+
+    def to_representation(self, data):
+        items = list(data.all() if hasattr(data, 'all') else data)
+        summaries.get_summaries({item.activity.actor_id for item in items} - {None}, self.context)
+        return super().to_representation(items)
+
+
+class NotificationSerializer(serializers.ModelSerializer):
+    kind = serializers.CharField(source='activity.kind', read_only=True)
+    event = serializers.IntegerField(source='activity.event_id', read_only=True)
+    actor = serializers.SerializerMethodField()
+    data = serializers.JSONField(source='activity.data', read_only=True)
+    is_read = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Notification
+        fields = ['id', 'kind', 'event', 'actor', 'data', 'is_read', 'read_at', 'created_at']
+        read_only_fields = fields
+        list_serializer_class = NotificationListSerializer
+
+    def get_actor(self, obj):
+        if obj.activity.actor_id is None:
+            return None
+        return summaries.get_summary(obj.activity.actor_id, self.context)
+
+    def get_is_read(self, obj):
+        return obj.read_at is not None
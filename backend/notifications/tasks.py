@@ -0,0 +1,10 @@
+from taskqueue.queue import task
+
+from . import fanout
+
+
+@task
+def fan_out(activity_id):
+    """Deliver one batch of an activity, then queue the next one."""
+    if fanout.fan_out_batch(activity_id) is not None:
+        fan_out.enqueue(activity_id=activity_id)
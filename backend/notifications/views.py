@@ -0,0 +1,46 @@
+from rest_framework import generics, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from . import fanout
+from .models import Notification
+from .pagination import InboxPagination
+from .serializers import NotificationSerializer
+
+
+class NotificationListView(generics.ListAPIView):
+    serializer_class = NotificationSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = InboxPagination
+    filter_backends = []
+
+    def get_queryset(self):
+        queryset = Notification.objects.filter(user=self.request.user).select_related('activity')
+        if self.request.query_params.get('unread') in ('1', 'true'):
+            queryset = queryset.filter(read_at__isnull=True)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        response.data['unread_count'] = fanout.unread_count(request.user)
+        return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def unread_count(request):
+    return Response({'unread_count': fanout.unread_count(request.user)})
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def mark_read(request):
+    """Mark the given notification `ids` read, or all of them when no ids are sent."""
+    ids = request.data.get('ids')
+    if ids is not None and (
+        not isinstance(ids, list) or not all(isinstance(value, int) for value in ids)
+    ):
+        return Response({'error': 'ids must be a list of integers'}, status=status.HTTP_400_BAD_REQUEST)
+
+    updated = fanout.mark_read(request.user, ids)
+    return Response({'updated': updated, 'unread_count': fanout.unread_count(request.user)})
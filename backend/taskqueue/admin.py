@@ -0,0 +1,11 @@
+from django.contrib import admin
+from .models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'attempts', 'max_attempts', 'run_at', 'created_at')
+    list_filter = ('status', 'name')
+    search_fields = ('name',)
+    ordering = ('run_at',)
+    readonly_fields = ('created_at', 'updated_at', 'locked_at', 'last_error')
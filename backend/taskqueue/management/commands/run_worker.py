@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from taskqueue.queue import run_pending
+
+
+class Command(BaseCommand):
+    help = 'Run a background task worker against the database queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10)
+        parser.add_argument('--sleep', type=float, default=1.0,
+                            help='Seconds to wait when the queue is empty')
+        parser.add_argument('--once', action='store_true',
+                            help='Drain the queue and exit instead of polling forever')
+
+    def handle(self, *args, **options):
+        processed = 0
+        self.stdout.write('Worker started')
+        try:
+            while True:
+                close_old_connections()
+                count = run_pending(options['batch_size'])
+                processed += count
+                if count:
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f'Worker stopped after processing {processed} tasks'))
@@ -0,0 +1,121 @@
+import logging
+import random
+import traceback
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 10
+BACKOFF_MAX_SECONDS = 60 * 60
+# Tasks left running longer than this are assumed to belong to a dead worker
+LOCK_TIMEOUT = timedelta(minutes=10)
+
+_registry = {}
+
+
+def task(func=None, *, name=None, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """
+    Register a function as a background task. The function receives the
+    enqueued keyword arguments, which must be JSON-serializable.
+
+        @task
+        def geocode_event(event_id): ...
+
+        geocode_event.enqueue(event_id=event.id)
+    """
+    def decorator(f):
+        task_name = name or f'{f.__module__}.{f.__name__}'
+        _registry[task_name] = f
+        f.task_name = task_name
+        f.enqueue = lambda delay=None, **kwargs: enqueue(
+            task_name, delay=delay, max_attempts=max_attempts, **kwargs
+        )
+        return f
+
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+
+def enqueue(name, delay=None, max_attempts=DEFAULT_MAX_ATTEMPTS, **kwargs):
+    """
+    Add a task to the queue. Inside a transaction the task row commits (or
+    rolls back) together with the work that scheduled it.
+    """
+    run_at = timezone.now() + delay if delay else timezone.now()
+    return Task.objects.create(name=name, payload=kwargs, run_at=run_at, max_attempts=max_attempts)
+
+
+def backoff(attempts):
+    delay = min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def claim(batch_size=10):
+    """
+    Lock up to `batch_size` due tasks with SELECT ... FOR UPDATE SKIP LOCKED
+    so concurrent workers never pick the same row, then mark them running.
+    On backends without row locks (SQLite) the lock is a no-op.
+    """
+    now = timezone.now()
+    due = Q(status=Task.STATUS_PENDING, run_at__lte=now) | Q(
+        status=Task.STATUS_RUNNING, locked_at__lt=now - LOCK_TIMEOUT
+    )
+    with transaction.atomic():
+        ids = list(
+            Task.objects.select_for_update(skip_locked=True)
+            .filter(due)
+            .order_by('run_at')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return []
+        Task.objects.filter(id__in=ids).update(
+            status=Task.STATUS_RUNNING, locked_at=now, attempts=F('attempts') + 1
+        )
+    return list(Task.objects.filter(id__in=ids).order_by('run_at'))
+
+
+def run(task_obj):
+    """
+    Execute a claimed task. Successful tasks are deleted to keep the queue
+    table small; failures are retried with exponential backoff until
+    max_attempts, then kept as failed for inspection.
+    Returns True on success.
+    """
+    func = _registry.get(task_obj.name)
+    try:
+        if func is None:
+            raise LookupError(f'Unknown task: {task_obj.name}')
+        func(**task_obj.payload)
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning('Task %s (%s) failed on attempt %s', task_obj.id, task_obj.name, task_obj.attempts)
+        if task_obj.attempts >= task_obj.max_attempts:
+            Task.objects.filter(id=task_obj.id).update(
+                status=Task.STATUS_FAILED, locked_at=None, last_error=error, updated_at=timezone.now()
+            )
+        else:
+            Task.objects.filter(id=task_obj.id).update(
+                status=Task.STATUS_PENDING, locked_at=None, last_error=error,
+                run_at=timezone.now() + backoff(task_obj.attempts), updated_at=timezone.now()
+            )
+        return False
+
+    Task.objects.filter(id=task_obj.id).delete()
+    return True
+
+
+def run_pending(batch_size=10):
+    """Claim and run one batch. Returns the number of tasks processed."""
+    tasks = claim(batch_size)
+    for task_obj in tasks:
+        run(task_obj)
+    return len(tasks)
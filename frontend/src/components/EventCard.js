@@ -1,7 +1,29 @@
-import React from 'react';
-import { Link } from 'react-router-dom';
+import React, { useState } from 'react';
+import { Link, useNavigate } from 'react-router-dom';
+import { useAuth } from '../contexts/AuthContext';
+import api from '../services/api';
 
 const EventCard = ({ event }) => {
+  const { isAuthenticated } = useAuth();
+  const navigate = useNavigate();
+  const [joining, setJoining] = useState(false);
+
+  // Upcoming occurrences of a recurring series have no id until someone joins
+  const handleJoinOccurrence = async () => {
+    if (!isAuthenticated) {
+      navigate('/login');
+      return;
+    }
+
+    try {
+      setJoining(true);
+      const response = await api.post(`/events/series/${event.series}/occurrences/${event.occurrence}/join/`);
+      navigate(`/events/${response.data.event_id}`);
+    } catch (error) {
+      console.error('Error joining event:', error);
+      setJoining(false);
+    }
+  };
 
   const formatDate = (dateTime) => {
     const date = new Date(dateTime);
@@ -74,12 +96,22 @@ const EventCard = ({ event }) => {
           <div className="text-sm text-gray-500">
             Hosted by {event.host.first_name} {event.host.last_name}
           </div>
-          <Link
-            to={`/events/${event.id}`}
-            className="bg-primary-600 text-white px-4 py-2 rounded-md text-sm font-medium hover:bg-primary-700 transition-colors duration-200"
-          >
-            View Details
-          </Link>
+          {event.id ? (
+            <Link
+              to={`/events/${event.id}`}
+              className="bg-primary-600 text-white px-4 py-2 rounded-md text-sm font-medium hover:bg-primary-700 transition-colors duration-200"
+            >
+              View Details
+            </Link>
+          ) : (
+            <button
+              onClick={handleJoinOccurrence}
+              disabled={joining}
+              className="bg-primary-600 text-white px-4 py-2 rounded-md text-sm font-medium hover:bg-primary-700 transition-colors duration-200 disabled:opacity-50"
+            >
+              {joining ? 'Joining...' : 'Join Event'}
+            </button>
+          )}
         </div>
       </div>
     </div>
@@ -11,6 +11,7 @@ const EventDetail = () => {
   const [comments, setComments] = useState([]);
   const [loading, setLoading] = useState(true);
   const [joining, setJoining] = useState(false);
+  const [waitlistPosition, setWaitlistPosition] = useState(null);
   const [newComment, setNewComment] = useState('');
   const [submittingComment, setSubmittingComment] = useState(false);
 
@@ -26,6 +27,15 @@ const EventDetail = () => {
     }
   }, [id, navigate]);
 
+  const fetchWaitlistPosition = useCallback(async () => {
+    try {
+      const response = await api.get(`/events/${id}/waitlist/`);
+      setWaitlistPosition(response.data.position);
+    } catch (error) {
+      console.error('Error fetching waitlist position:', error);
+    }
+  }, [id]);
+
   const fetchComments = useCallback(async () => {
     try {
       const response = await api.get(`/events/${id}/comments/`);
@@ -43,6 +53,12 @@ const EventDetail = () => {
     fetchComments();
   }, [fetchEvent, fetchComments]);
 
+  useEffect(() => {
+    if (isAuthenticated && event && event.waitlist_length > 0) {
+      fetchWaitlistPosition();
+    }
+  }, [isAuthenticated, event, fetchWaitlistPosition]);
+
   const handleJoinEvent = async () => {
     if (!isAuthenticated) {
       navigate('/login');
@@ -51,7 +67,11 @@ const EventDetail = () => {
 
     try {
       setJoining(true);
-      await api.post(`/events/${id}/join/`);
+      const response = await api.post(`/events/${id}/join/`);
+      if (response.status === 202) {
+        // Event is full; we're queued and get promoted automatically when a seat frees up
+        setWaitlistPosition(response.data.waitlist_position);
+      }
       fetchEvent(); // Refresh event data
     } catch (error) {
       console.error('Error joining event:', error);
@@ -60,6 +80,19 @@ const EventDetail = () => {
     }
   };
 
+  const handleLeaveWaitlist = async () => {
+    try {
+      setJoining(true);
+      await api.delete(`/events/${id}/waitlist/`);
+      setWaitlistPosition(null);
+      fetchEvent(); // Refresh event data
+    } catch (error) {
+      console.error('Error leaving waitlist:', error);
+    } finally {
+      setJoining(false);
+    }
+  };
+
   const handleLeaveEvent = async () => {
     try {
       setJoining(true);
@@ -171,13 +204,24 @@ const EventDetail = () => {
                   >
                     {joining ? 'Leaving...' : 'Leave Event'}
                   </button>
+                ) : waitlistPosition ? (
+                  <div className="text-right">
+                    <p className="text-sm text-gray-600 mb-2">#{waitlistPosition} on the waitlist</p>
+                    <button
+                      onClick={handleLeaveWaitlist}
+                      disabled={joining}
+                      className="bg-gray-600 text-white px-4 py-2 rounded-md hover:bg-gray-700 disabled:opacity-50"
+                    >
+                      {joining ? 'Leaving...' : 'Leave Waitlist'}
+                    </button>
+                  </div>
                 ) : (
                   <button
                     onClick={handleJoinEvent}
-                    disabled={joining || event.is_full}
+                    disabled={joining}
                     className="bg-primary-600 text-white px-4 py-2 rounded-md hover:bg-primary-700 disabled:opacity-50"
                   >
-                    {joining ? 'Joining...' : event.is_full ? 'Event Full' : 'Join Event'}
+                    {joining ? 'Joining...' : event.is_full ? 'Join Waitlist' : 'Join Event'}
                   </button>
                 )}
               </div>
@@ -142,7 +142,7 @@ const Events = () => {
     return (
       <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
         {events.map(event => (
-          <EventCard key={event.id} event={event} />
+          <EventCard key={event.id || `${event.series}-${event.occurrence}`} event={event} />
         ))}
       </div>
     );
@@ -21,7 +21,9 @@ const Profile = () => {
         api.get('/events/')
       ]);
       
-      setUserEvents(hostedResponse.data.results || hostedResponse.data);
+      // Skip upcoming series occurrences nobody has joined yet; they have no page of their own
+      const hosted = hostedResponse.data.results || hostedResponse.data;
+      setUserEvents(hosted.filter(event => event.id));
       
       // Filter events where user is attending
       const allEvents = attendingResponse.data.results || attendingResponse.data;
@@ -16,6 +16,10 @@ api.interceptors.request.use(
     if (token) {
       config.headers.Authorization = `Bearer ${token}`;
     }
+    // One key per logical write; retries below reuse the same config and key
+    if (config.method === 'post' && !config.headers['Idempotency-Key']) {
+      config.headers['Idempotency-Key'] = crypto.randomUUID();
+    }
     return config;
   },
   (error) => {
@@ -39,8 +43,12 @@ api.interceptors.response.use(
             refresh: refreshToken
           });
           
-          const { access } = response.data;
+          const { access, refresh } = response.data;
           localStorage.setItem('token', access);
+          // Refresh tokens are rotated; the old one is blacklisted after use
+          if (refresh) {
+            localStorage.setItem('refreshToken', refresh);
+          }
           api.defaults.headers.common['Authorization'] = `Bearer ${access}`;
           originalRequest.headers['Authorization'] = `Bearer ${access}`;
           